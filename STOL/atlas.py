@@ -0,0 +1,227 @@
+" piecewise-monomial map of the Mission optimum over the sweep axes "
+from itertools import product
+import numpy as np
+from template import MissionTemplate, axis_var
+
+# pylint: disable=invalid-name, too-many-instance-attributes
+
+AXES = ("RNWY", "RNG", "PAY", "VCR", "aircraft.hbatt", "landing.CLland",
+        "GLND")
+OUTPUTS = ("aircraft.W", "aircraft.Wbatt", "aircraft.Wstruct",
+           "aircraft.Wmotor")
+
+def active_set(sol, tol=1e-5):
+    """ indices of the constraints that are tight in sol
+
+    A posynomial constraint is tight where its dual variable (la) is
+    nonzero; tol is relative to the largest one.
+    """
+    senss = sol["sensitivities"]
+    if "la" in senss:
+        la = np.abs(np.ravel(senss["la"]))[1:]
+        return tuple(np.nonzero(la > tol*la.max())[0])
+    s = [abs(float(v)) for _, v in sorted(
+        (str(c), v) for c, v in senss["constraints"].items())]
+    return tuple(i for i, v in enumerate(s) if v > tol*max(s))
+
+def _value(sol, var):
+    " float value of var in sol "
+    v = sol(var)
+    return float(getattr(v, "magnitude", v))
+
+def _fit(X, Y, exact=True):
+    """ least-squares coefficients (intercept, then one row per axis) of Y
+    linear in X; None if exact and X does not determine them """
+    A = np.hstack([np.ones((len(X), 1)), X])
+    coef, _, rank, _ = np.linalg.lstsq(A, Y, rcond=None)
+    if exact and rank < A.shape[1]:
+        return None
+    return coef
+
+class SolutionAtlas(object):
+    """ the Mission optimum as a set of monomials in the axis values
+
+    In log space the optimal objective of a GP is a convex function of the
+    log of its constants, and each solve gives its value and exact gradient
+    (the sensitivities) at one point: the tangent monomial
+
+        f(p) >= f(p0)*prod((p_a/p0_a)**s_a)
+
+    so the maximum over every solved point's monomial approximates f from
+    below, exactly at the solved points and wherever the active set, and
+    with it the monomial, stays the same.  Solved points are grouped into
+    regions by active set; each region stores the log-space box of its
+    points and, for every output, a monomial fitted to them.  A region whose
+    points do not determine the len(axes)+1 monomial parameters (too few,
+    or all in a subspace) takes the fit of the nearest region that has one,
+    else the fit over every point, and records the region it took as
+    "fit" (None for every point).  query() evaluates the tangents, takes
+    the region of the largest and never calls a solver.
+
+    Arguments
+    ---------
+    axes        swept constants, names accepted by template.axis_var
+    outputs     variables whose values are mapped besides the objective
+    tol         relative dual value below which a constraint is slack
+    template_kw MissionTemplate arguments (objective, subs, solver, ...)
+    """
+    def __init__(self, axes=AXES, outputs=OUTPUTS, tol=1e-5, **template_kw):
+        self.axes = tuple(axes)
+        self.outputs = tuple(outputs)
+        self.tol = tol
+        self.template_kw = template_kw
+        self.template = None
+        self.X = []
+        self.c = []
+        self.S = []
+        self.Y = []
+        self.sets = []
+        self.failed = []
+        self.regions = {}
+        self._c = self._S = self._coef = self._box = None
+
+    def _template(self):
+        " MissionTemplate over self.axes, built on first use "
+        if self.template is None:
+            self.template = MissionTemplate(axes=self.axes,
+                                            **self.template_kw)
+        return self.template
+
+    def add(self, point):
+        " solve point (dict of axis: value), returns its active set or None "
+        template = self._template()
+        try:
+            sol = template.solve(point)
+        except Exception:  # pylint: disable=broad-except
+            self.failed.append(dict(point))
+            return None
+        m = template.model
+        x = np.log([float(point[a]) for a in self.axes])
+        senss = template.sensitivities(sol)
+        self.X.append(x)
+        self.c.append(np.log(float(sol["cost"])))
+        self.S.append(np.array([senss[a] for a in self.axes]))
+        self.Y.append(np.log([_value(sol, axis_var(m, o))
+                              for o in self.outputs]))
+        aset = active_set(sol, self.tol)
+        self.sets.append(aset)
+        self.regions = {}
+        return aset
+
+    def explore(self, grid, depth=3):
+        """ solve every point of grid (dict of axis: values), then bisect
+        in log space between grid neighbours whose active sets differ, up
+        to depth times, to place the region boundaries """
+        values = [sorted(grid[a]) for a in self.axes]
+        sets = {}
+        for idx in product(*[range(len(v)) for v in values]):
+            sets[idx] = self.add(dict((a, v[i]) for a, v, i
+                                      in zip(self.axes, values, idx)))
+        for idx, aset in sets.items():
+            for j in range(len(self.axes)):
+                nidx = idx[:j] + (idx[j] + 1,) + idx[j+1:]
+                if nidx not in sets or aset is None or sets[nidx] is None:
+                    continue
+                if sets[nidx] != aset:
+                    self._bisect(
+                        np.log([v[i] for v, i in zip(values, idx)]), aset,
+                        np.log([v[i] for v, i in zip(values, nidx)]),
+                        sets[nidx], depth)
+
+    def _bisect(self, xa, seta, xb, setb, depth):
+        " solve log-midpoints between two points of different active sets "
+        if depth == 0 or seta == setb:
+            return
+        xm = 0.5*(xa + xb)
+        setm = self.add(dict(zip(self.axes, np.exp(xm))))
+        if setm is None:
+            return
+        self._bisect(xa, seta, xm, setm, depth - 1)
+        self._bisect(xm, setm, xb, setb, depth - 1)
+
+    def build(self):
+        " group the solved points into regions and fit their outputs "
+        X, Y = np.array(self.X), np.array(self.Y)
+        self.regions = {}
+        for aset in set(self.sets):
+            rows = [i for i, s in enumerate(self.sets) if s == aset]
+            self.regions[aset] = {"rows": rows, "lower": X[rows].min(axis=0),
+                                  "upper": X[rows].max(axis=0),
+                                  "centre": X[rows].mean(axis=0),
+                                  "outputs": _fit(X[rows], Y[rows]),
+                                  "fit": aset}
+        fitted = [s for s, r in self.regions.items()
+                  if r["outputs"] is not None]
+        overall = None
+        for aset, region in self.regions.items():
+            if region["outputs"] is not None:
+                continue
+            if fitted:
+                source = min(fitted, key=lambda s: (
+                    (self.regions[s]["centre"] - region["centre"])**2).sum())
+                region["outputs"] = self.regions[source]["outputs"]
+                region["fit"] = source
+            else:
+                if overall is None:
+                    overall = _fit(X, Y, exact=False)
+                region["outputs"] = overall
+                region["fit"] = None
+        self._c = np.array(self.c) - (np.array(self.S)*X).sum(axis=1)
+        self._S = np.array(self.S)
+        regions = [self.regions[s] for s in self.sets]
+        self._coef = np.array([r["outputs"] for r in regions])
+        self._box = (np.array([r["lower"] for r in regions]),
+                     np.array([r["upper"] for r in regions]))
+
+    def query(self, points):
+        """ objective, region and outputs at points (dict of axis: value or
+        arrays of values) without solving
+
+        Returns a dict with "cost", "region" (index into self.sets of the
+        tangent that holds), "inside" (whether the point is within that
+        region's box of solved points) and one entry per output.
+        """
+        if not self.regions:
+            self.build()
+        x = np.log(np.array([np.atleast_1d(points[a]) for a in self.axes],
+                            dtype=float)).T
+        logf = self._c + x.dot(self._S.T)
+        best = logf.argmax(axis=1)
+        coef = self._coef[best]
+        Y = coef[:, 0] + np.einsum("ka,kao->ko", x, coef[:, 1:])
+        lower, upper = self._box[0][best], self._box[1][best]
+        out = {"cost": np.exp(logf.max(axis=1)), "region": best,
+               "inside": ((x >= lower - 1e-9) & (x <= upper + 1e-9)).all(
+                   axis=1)}
+        for j, o in enumerate(self.outputs):
+            out[o] = np.exp(Y[:, j])
+        return out
+
+    def save(self, filename):
+        " write the solved points to an .npz file "
+        np.savez(filename, axes=np.array(self.axes),
+                 outputs=np.array(self.outputs), X=np.array(self.X),
+                 c=np.array(self.c), S=np.array(self.S), Y=np.array(self.Y),
+                 sets=np.array([" ".join(map(str, s)) for s in self.sets]))
+
+    @classmethod
+    def load(cls, filename, **template_kw):
+        " atlas saved by save(), ready to query or extend "
+        data = np.load(filename)
+        atlas = cls(axes=list(data["axes"]), outputs=list(data["outputs"]),
+                    **template_kw)
+        atlas.X, atlas.c = list(data["X"]), list(data["c"])
+        atlas.S, atlas.Y = list(data["S"]), list(data["Y"])
+        atlas.sets = [tuple(int(i) for i in s.split()) for s in data["sets"]]
+        atlas.build()
+        return atlas
+
+if __name__ == "__main__":
+    ATLAS = SolutionAtlas()
+    ATLAS.explore({"RNWY": [100, 300, 500], "RNG": [50, 125, 200],
+                   "PAY": [780, 1560], "VCR": [80, 120],
+                   "aircraft.hbatt": [210, 300], "landing.CLland": [3.5, 4.5],
+                   "GLND": [0.5, 1.]})
+    ATLAS.save("atlas.npz")
+    print "%d points, %d regions, %d failed" % (
+        len(ATLAS.X), len(set(ATLAS.sets)), len(ATLAS.failed))
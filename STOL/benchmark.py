@@ -0,0 +1,182 @@
+" time Mission construction, compilation and solving "
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import subprocess
+from functools import partial
+import numpy as np
+import gpkit
+from gpkit.tools.autosweep import autosweep_1d
+from stol import Mission, baseline, advanced
+from solvers import get_solver, available
+
+# pylint: disable=invalid-name, broad-except
+
+SUBS = {"baseline": baseline, "advanced": advanced}
+
+def timed(fn, repeat):
+    " times of repeat calls of fn and its last return value "
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.time()
+        out = fn()
+        times.append(time.time() - t0)
+    return out, times
+
+def _raise(error):
+    " phase whose setup failed "
+    raise error
+
+def built(subs, **kwargs):
+    " Mission with subs applied and W as the objective "
+    M = Mission(**kwargs)
+    subs(M)
+    M.cost = M.aircraft.W
+    return M
+
+def phases(subs, solver):
+    " (name, function) of every benchmarked phase for one substitution set "
+    M = built(subs)
+    sol = M.solve(solver, verbosity=0)
+    try:
+        MSP = built(subs, sp=True)
+        localsolve = lambda: MSP.localsolve(solver, verbosity=0)
+    except Exception as e:
+        localsolve = partial(_raise, e)
+
+    program = M.gp()
+    msweep = built(subs)
+
+    def sweep():
+        " autosweep_1d of runway length, the model built outside the timing "
+        if msweep.Srunway in msweep.substitutions:
+            del msweep.substitutions[msweep.Srunway]
+        return autosweep_1d(msweep, 0.1, msweep.Srunway, [300, 800],
+                            solver=solver, verbosity=0)
+
+    # compile and solve are timed apart; Model.solve is both plus
+    # processing the result into a SolutionArray
+    return [
+        ("Mission(sp=False)", lambda: Mission(sp=False)),
+        ("Mission(sp=True)", lambda: Mission(sp=True)),
+        ("Mission(costModel=True)", lambda: Mission(costModel=True)),
+        ("compile", M.gp),
+        ("solve", lambda: program.solve(solver, verbosity=0)),
+        ("Model.solve", lambda: M.solve(solver, verbosity=0)),
+        ("localsolve", localsolve),
+        ("autosweep_1d", sweep),
+        ("table", sol.table),
+        ]
+
+def run(repeat=5, solver=None, subsets=("baseline", "advanced")):
+    " benchmark results as a json-ready dict "
+    solver = solver or get_solver()
+    results = {}
+    for name in subsets:
+        results[name] = {}
+        try:
+            todo = phases(SUBS[name], solver)
+        except Exception as e:
+            results[name]["setup"] = {"error": "%s: %s" % (type(e).__name__,
+                                                           e)}
+            continue
+        for phase, fn in todo:
+            try:
+                _, times = timed(fn, repeat)
+                results[name][phase] = {"min": min(times),
+                                        "median": float(np.median(times)),
+                                        "times": times}
+            except Exception as e:
+                results[name][phase] = {"error": "%s: %s" % (
+                    type(e).__name__, e)}
+    return {"meta": meta(solver, repeat), "results": results}
+
+def meta(solver, repeat):
+    " where and on what the benchmark ran "
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "gpkit": gpkit.__version__,
+            "python": platform.python_version(), "host": socket.gethostname(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "solver": solver,
+            "repeat": repeat}
+
+def backends(repeat=5, subsets=("baseline", "advanced")):
+    """ solve time of each substitution set on every usable solver and the
+    relative difference of its objective from the first solver's """
+    results = {}
+    for name in subsets:
+        M = built(SUBS[name])
+        results[name] = {}
+        ref = None
+        for solver in available():
+            try:
+                sol, times = timed(partial(M.solve, solver, verbosity=0),
+                                   repeat)
+            except Exception as e:
+                results[name][solver] = {"error": "%s: %s" % (
+                    type(e).__name__, e)}
+                continue
+            cost = float(getattr(sol["cost"], "magnitude", sol["cost"]))
+            ref = cost if ref is None else ref
+            results[name][solver] = {"min": min(times),
+                                     "median": float(np.median(times)),
+                                     "times": times, "cost": cost,
+                                     "rel_diff": abs(cost - ref)/abs(ref)}
+    return {"meta": meta(",".join(available()), repeat), "results": results}
+
+def compare(old, new, threshold=1.1):
+    " print median times of new relative to old, flag slowdowns "
+    print "%-12s %-26s %10s %10s %7s" % ("set", "phase", "old [s]", "new [s]",
+                                         "ratio")
+    for name in sorted(new["results"]):
+        for phase, r in sorted(new["results"][name].items()):
+            o = old["results"].get(name, {}).get(phase, {})
+            if "median" not in r or "median" not in o:
+                continue
+            ratio = r["median"]/o["median"]
+            print "%-12s %-26s %10.4f %10.4f %6.2fx%s" % (
+                name, phase, o["median"], r["median"], ratio,
+                " SLOWER" if ratio > threshold else "")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--solver", default=None,
+                        help="default: solvers.get_solver()")
+    parser.add_argument("--backends", action="store_true",
+                        help="time and cross-check every usable solver")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*[json.load(open(f)) for f in args.compare])
+        sys.exit()
+
+    if args.backends:
+        out = backends(args.repeat)
+        with open(args.output, "w") as fid:
+            json.dump(out, fid, indent=2, sort_keys=True)
+        for name, res in sorted(out["results"].items()):
+            for solver, r in sorted(res.items()):
+                print "%-10s %-10s %s" % (name, solver, r["error"] if "error"
+                                          in r else "%.4f s  rel. diff %.2e" %
+                                          (r["median"], r["rel_diff"]))
+        sys.exit()
+
+    out = run(args.repeat, args.solver)
+    with open(args.output, "w") as fid:
+        json.dump(out, fid, indent=2, sort_keys=True)
+    for name, res in sorted(out["results"].items()):
+        for phase, r in sorted(res.items()):
+            print "%-10s %-26s %s" % (name, phase, "%.4f s" % r["median"]
+                                      if "median" in r else r["error"])
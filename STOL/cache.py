@@ -0,0 +1,162 @@
+" content-addressed on-disk cache of Mission solutions "
+import os
+import hashlib
+import cPickle as pkl
+import numpy as np
+import gpkit
+from gpkit.tools.autosweep import autosweep_1d
+from solvers import get_solver
+
+# pylint: disable=invalid-name
+
+PATH = os.path.dirname(os.path.abspath(__file__))
+# puts between full scans of the cache directory
+RESCAN = 500
+
+SOURCES = ["stol.py", "landing.py", "cost.py", "flightstate.py", "logfit.csv"]
+
+def source_hash():
+    " hash of the model source files, logfit.csv and the gpkit version "
+    h = hashlib.sha1(gpkit.__version__)
+    for f in SOURCES:
+        with open(os.path.join(PATH, f), "rb") as fid:
+            h.update(fid.read())
+    return h.hexdigest()
+
+def _hashable(value):
+    " stable text of a substitution value "
+    value = getattr(value, "magnitude", value)
+    try:
+        return repr(np.asarray(value, dtype=float).tolist())
+    except (TypeError, ValueError):
+        return repr(value)
+
+class SolveCache(object):
+    """ solutions pickled to disk under a hash of everything they depend on
+
+    The key covers the Mission structure (sp and costModel flags and the
+    objective), every substitution, the solver name and source_hash(), so
+    editing the model sources or logfit.csv invalidates old entries.  Hits
+    refresh the file time and the least recently used entries are evicted
+    once the cache grows past max_bytes.
+
+    Arguments
+    ---------
+    directory   where entries are stored, default STOL/.solvecache
+    max_bytes   size bound of the cache directory
+    """
+    def __init__(self, directory=None, max_bytes=2**30):
+        self.directory = directory or os.path.join(PATH, ".solvecache")
+        self.max_bytes = max_bytes
+        self.source = source_hash()
+        self.hits = 0
+        self.misses = 0
+        # running estimate of the directory size, rescanned by evict()
+        self.size = None
+        self.puts = 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def key(self, model, solver, *extra):
+        " hash of the model structure, substitutions, solver and sources "
+        h = hashlib.sha1(self.source)
+        h.update(repr((getattr(model, "sp", None),
+                       getattr(model, "costModel", None),
+                       str(model.cost), solver, extra)))
+        for k, v in sorted((str(vk), _hashable(v))
+                           for vk, v in model.substitutions.items()):
+            h.update(k)
+            h.update(v)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key):
+        " cached value for key, or None "
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fid:
+                value = pkl.load(fid)
+        except (IOError, EOFError, pkl.UnpicklingError):
+            self.misses += 1
+            return None
+        os.utime(path, None)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """ store value under key, written atomically; evict once the
+        running size estimate passes max_bytes, and every RESCAN puts to
+        count entries written by other processes """
+        path = self._path(key)
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "wb") as fid:
+            pkl.dump(value, fid, pkl.HIGHEST_PROTOCOL)
+            written = fid.tell()
+        os.rename(tmp, path)
+        self.puts += 1
+        if self.size is not None:
+            self.size += written
+        if (self.size is None or self.size > self.max_bytes
+                or self.puts % RESCAN == 0):
+            self.evict()
+
+    def evict(self):
+        " remove least recently used entries until under max_bytes "
+        entries = []
+        for f in os.listdir(self.directory):
+            if f.endswith(".pkl"):
+                st = os.stat(os.path.join(self.directory, f))
+                entries.append((st.st_mtime, st.st_size, f))
+        total = sum(e[1] for e in entries)
+        for _, size, f in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, f))
+            except OSError:
+                pass
+            total -= size
+        self.size = total
+
+    def clear(self):
+        " remove every entry "
+        for f in os.listdir(self.directory):
+            if f.endswith(".pkl"):
+                os.remove(os.path.join(self.directory, f))
+        self.size = 0
+
+    def solve(self, model, solver=None, **kwargs):
+        " model.solve, or model.localsolve if model.sp, through the cache "
+        solver = solver or get_solver()
+        key = self.key(model, solver)
+        sol = self.get(key)
+        if sol is None:
+            if getattr(model, "sp", False):
+                sol = model.localsolve(solver, **kwargs)
+            else:
+                sol = model.solve(solver, **kwargs)
+            self.put(key, sol)
+        return sol
+
+    def autosweep(self, model, tol, var, bounds, project=None, x=None,
+                  **kwargs):
+        """ autosweep_1d through the cache
+
+        With a projection.Projection, only its rows sampled at x are cached
+        and returned instead of the tree.
+        """
+        kwargs.setdefault("solver", get_solver())
+        extra = ()
+        if project:
+            extra = (tuple(project.columns), _hashable(x))
+        key = self.key(model, kwargs["solver"], "autosweep", str(var), tol,
+                       tuple(bounds), *extra)
+        bst = self.get(key)
+        if bst is None:
+            bst = autosweep_1d(model, tol, var, bounds, **kwargs)
+            if project:
+                bst = project.sample(bst, x)
+            self.put(key, bst)
+        return bst
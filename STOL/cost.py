@@ -1,5 +1,6 @@
-from gpkit import Model, Variable, units
 """Vehicle cost model"""
+import numpy as np
+from gpkit import Model, Variable, units
 class Cost(Model):
     def setup(self, aircraft):
         struct_Sp_Cost  = Variable('struct_Sp_Cost', 150., '1/kg', 'Cost per kilo of structure')
@@ -35,16 +36,16 @@ class Cost(Model):
         g = Variable("g", 9.81, "m/s**2", "gravitational constant")
 
 
-        constraints=[Cost_Motors >= aircraft["W_{motor}"]/g * motor_Sp_Cost,
-                            Cost_Structures >= aircraft["W_{struct}"]/g * struct_Sp_Cost,
-                            Cost_Battery == aircraft["W_{batt}"]/g*aircraft["h_{batt}"] * battery_Sp_Cost,
+        constraints=[Cost_Motors >= aircraft.Wmotor/g * motor_Sp_Cost,
+                            Cost_Structures >= aircraft.Wstruct/g * struct_Sp_Cost,
+                            Cost_Battery == aircraft.Wbatt/g*aircraft.hbatt * battery_Sp_Cost,
                             Cost_Vehicle >= (Cost_Addl + Cost_Motors + Cost_Structures + Cost_Battery),
                             Cost_Vehicle_Spares >= (Cost_Vehicle)*spares_factor_vehicle,
                             Cost_Battery_Spares == (Cost_Battery)*spares_factor_battery,
                             useful_life_trips == trips_per_year * useful_life_vehicle,
                             Cost_vehicle_per_trip >= Cost_Vehicle_Spares/useful_life_trips,
                             Cost_battery_per_trip >= Cost_Battery_Spares*cycles_per_trip/cycle_life_battery,
-                            Cost_Energy_per_trip >= aircraft["W_{batt}"]/g*aircraft["h_{batt}"] * energy_cost,
+                            Cost_Energy_per_trip >= aircraft.Wbatt/g*aircraft.hbatt * energy_cost,
                             Cost_per_trip >= (Cost_battery_per_trip
                                              + Cost_Energy_per_trip
                                              #+ Cost_battery_replacement_per_trip
@@ -55,4 +56,70 @@ class Cost(Model):
                 
             ]
 
-        return constraints
\ No newline at end of file
+        return constraints
+# g of the Cost model, which turns weights into masses as W/g
+G = 9.81  # m/s**2
+N_PER_LBF = 4.4482216152605
+
+# defaults of the economic constants of Cost, keyed as evaluate_cost args
+ECONOMICS = {"struct_Sp_Cost": 150., "motor_Sp_Cost": 360.,
+             "batt_Sp_Cost": 150., "Cost_Addl": 50000.,
+             "trips_per_year": 1000., "battery_cycles_per_trip": 1.,
+             "spares_vehicle": 1.1, "spares_battery": 1.1,
+             "cycle_life_battery": 2000., "useful_life_vehicle": 10.,
+             "energy_cost": .1, "cost_maint_per_trip": 14.,
+             "landing_fee": 50., "pilot_fee": 50.}
+
+def _magnitude(value, unit):
+    " value in unit, plain numbers are taken to be in unit already "
+    if hasattr(value, "to"):
+        value = value.to(unit).magnitude
+    return np.asarray(value, dtype=float)
+
+def evaluate_cost(Wmotor, Wstruct, Wbatt, hbatt, **economics):
+    """ Cost_per_trip and its breakdown for a sized aircraft
+
+    Evaluates the Cost constraints as equalities with NumPy instead of
+    solving, which is exact when the aircraft was sized for weight since
+    the economic constants then do not change the sizing.  Weights are in
+    lbf and hbatt in W*hr/kg (or pint quantities); economics override
+    ECONOMICS and every argument broadcasts, so arrays of assumptions are
+    evaluated in one pass.  Returns a dict keyed by the Cost variable names.
+    """
+    unknown = set(economics) - set(ECONOMICS)
+    if unknown:
+        raise TypeError("unknown economics: %s" % ", ".join(sorted(unknown)))
+    e = dict(ECONOMICS)
+    e.update(economics)
+    e = dict((k, np.asarray(v, dtype=float)) for k, v in e.items())
+    kg = N_PER_LBF/G  # mass in kg of 1 lbf divided by the model's g
+    hbatt = _magnitude(hbatt, "W*hr/kg")
+    energy = _magnitude(Wbatt, "lbf")*kg*hbatt/1000.  # kW*hr
+
+    out = {"Cost_Motors": _magnitude(Wmotor, "lbf")*kg*e["motor_Sp_Cost"],
+           "Cost_Structures": (_magnitude(Wstruct, "lbf")*kg
+                               *e["struct_Sp_Cost"]),
+           "Cost_Battery": energy*e["batt_Sp_Cost"]}
+    out["Cost_Vehicle"] = (e["Cost_Addl"] + out["Cost_Motors"]
+                           + out["Cost_Structures"] + out["Cost_Battery"])
+    out["Cost_Vehicle_Spares"] = out["Cost_Vehicle"]*e["spares_vehicle"]
+    out["Cost_Battery_Spares"] = out["Cost_Battery"]*e["spares_battery"]
+    out["useful_life_trip"] = e["trips_per_year"]*e["useful_life_vehicle"]
+    out["Cost_vehicle_per_trip"] = (out["Cost_Vehicle_Spares"]
+                                    /out["useful_life_trip"])
+    out["Cost_battery_per_trip"] = (out["Cost_Battery_Spares"]
+                                    *e["battery_cycles_per_trip"]
+                                    /e["cycle_life_battery"])
+    out["Cost_Energy_per_trip"] = energy*e["energy_cost"]
+    out["Cost_per_trip"] = (out["Cost_battery_per_trip"]
+                            + out["Cost_Energy_per_trip"]
+                            + out["Cost_vehicle_per_trip"]
+                            + e["cost_maint_per_trip"] + e["pilot_fee"]
+                            + e["landing_fee"])
+    return out
+
+def solution_cost(sol, aircraft, **economics):
+    " evaluate_cost of the aircraft sized in sol "
+    return evaluate_cost(sol(aircraft.Wmotor), sol(aircraft.Wstruct),
+                         sol(aircraft.Wbatt), sol(aircraft.hbatt),
+                         **economics)
@@ -0,0 +1,179 @@
+" predict sweep points from the sensitivities of solved neighbours "
+import random
+from collections import deque
+import numpy as np
+
+# pylint: disable=invalid-name, too-many-instance-attributes
+
+class Extrapolator(object):
+    """ first-order log-space expansion around the nearest solved point
+
+    The objective of a GP optimum has exact log-sensitivities to every
+    constant, so near a solved point p0
+
+        log f(p) ~ log f(p0) + sum_a s_a*(log p_a - log p0_a)
+
+    with an error that grows with the squared log-distance d2.  Every solved
+    point is first predicted from the points solved before it and the
+    observed error/d2 is kept, over the last window checks, for each
+    quantity and each axis the check moved along.  A prediction is used
+    only when sum_a bound_a*dlogp_a**2 is below tol for every quantity, so
+    axes that no check has moved along yet are never extrapolated.  Outputs
+    other than the objective have no sensitivities and are extrapolated
+    with log-slopes fitted to the nearest solved points, and not at all
+    while those do not span every axis.  A point at least as close to a
+    point that was infeasible (or failed) as to its nearest solved point is
+    always solved, since the expansion knows nothing of the feasibility
+    boundary.  Solved points are kept in arrays that grow by doubling.
+
+    Arguments
+    ---------
+    tol         accepted estimated error of log(value), ~relative error
+    outputs     columns of the sweep handler's result to predict as well
+    verify      fraction of predictable points that are solved anyway
+    min_checks  observed errors needed before any point is skipped
+    window      number of recent errors the bound is taken over
+    seed        seed of the verification sampling
+    """
+    def __init__(self, tol=0.01, outputs=(), verify=0.05, min_checks=5,
+                 window=50, seed=0):
+        self.tol = tol
+        self.outputs = tuple(outputs)
+        self.verify = verify
+        self.min_checks = min_checks
+        self.window = window
+        self.random = random.Random(seed)
+        self.axes = None
+        self.n = 0
+        self.X = None
+        self.logcost = None
+        self.sens = None
+        self.Y = None
+        self.nbad = 0
+        self.bad = None
+        self.curvature = {}
+        self.checks = 0
+        self.skipped = 0
+        self.verified = 0
+
+    def _logp(self, point):
+        " log of the axis values of point "
+        if self.axes is None:
+            self.axes = tuple(sorted(point))
+        return np.log([float(point[a]) for a in self.axes])
+
+    def _grow(self, name, n, row):
+        " set row n of array attribute name, doubling its capacity if full "
+        a = getattr(self, name)
+        row = np.asarray(row, dtype=float)
+        if a is None or n == len(a):
+            new = np.empty((max(16, 2*n),) + row.shape)
+            if a is not None:
+                new[:n] = a
+            a = new
+            setattr(self, name, a)
+        a[n] = row
+
+    def _slopes(self, X, Y, i):
+        " least-squares log-slopes of Y about row i over the nearest rows "
+        n = len(self.axes)
+        near = np.argsort(((X - X[i])**2).sum(axis=1))[:2*n + 1]
+        dX, dY = X[near] - X[i], Y[near] - Y[i]
+        ok = np.isfinite(dY).all(axis=1)
+        if ok.sum() <= n:
+            return np.full((n, Y.shape[1]), np.nan)
+        slopes, _, rank, _ = np.linalg.lstsq(dX[ok], dY[ok], rcond=None)
+        if rank < n:
+            return np.full((n, Y.shape[1]), np.nan)
+        return slopes
+
+    def predict(self, point):
+        """ (cost, dict of output: value, log-displacement) from the nearest
+        solved point, or None before any point is solved """
+        if not self.n:
+            return None
+        x = self._logp(point)
+        X = self.X[:self.n]
+        d2 = ((X - x)**2).sum(axis=1)
+        i = int(np.argmin(d2))
+        dx = x - X[i]
+        cost = np.exp(self.logcost[i] + np.dot(self.sens[i], dx))
+        outputs = {}
+        if self.outputs:
+            Y = self.Y[:self.n]
+            logy = Y[i] + dx.dot(self._slopes(X, Y, i))
+            outputs = dict(zip(self.outputs, np.exp(logy)))
+        return cost, outputs, dx
+
+    def error(self, dx):
+        " estimated error of a prediction at log-displacement dx "
+        if self.checks < self.min_checks:
+            return np.inf
+        err = 0.
+        for q in ("cost",) + self.outputs:
+            bound = sum(max(self.curvature.get((q, a)) or [np.inf])*d**2
+                        for a, d in zip(self.axes, dx) if d)
+            err = max(err, bound)
+        return err
+
+    def extrapolated(self, task):
+        " predicted record of a (key, point) task, None if it must be solved "
+        key, point = task
+        prediction = self.predict(point)
+        if prediction is None:
+            return None
+        cost, outputs, dx = prediction
+        err = self.error(dx)
+        if (not err <= self.tol or self.near_infeasible(point, dx)
+                or not np.isfinite(list(outputs.values())).all()):
+            return None
+        if self.verify and self.random.random() < self.verify:
+            self.verified += 1
+            return None
+        self.skipped += 1
+        return {"key": key, "point": point, "status": "ok", "cost": cost,
+                "result": outputs, "extrapolated": True,
+                "error_estimate": err}
+
+    def near_infeasible(self, point, dx):
+        """ whether an infeasible point is no farther from point than its
+        nearest solved point, at log-displacement dx """
+        if not self.nbad:
+            return False
+        d2 = ((self.bad[:self.nbad] - self._logp(point))**2).sum(axis=1)
+        return d2.min() <= (dx**2).sum()
+
+    def record(self, record):
+        " learn the prediction error at a solved point, then keep it "
+        if record["status"] in ("infeasible", "failed"):
+            self._grow("bad", self.nbad, self._logp(record["point"]))
+            self.nbad += 1
+            return
+        if record["status"] != "ok" or "sensitivities" not in record:
+            return
+        point = record["point"]
+        result = record.get("result") or {}
+        y = np.log([float(result.get(c, np.nan)) for c in self.outputs])
+        prediction = self.predict(point)
+        if prediction is not None and prediction[2].any():
+            cost, outputs, dx = prediction
+            d2 = (dx**2).sum()
+            errs = [("cost", abs(np.log(cost/record["cost"])))]
+            errs += [(c, abs(np.log(outputs[c]) - v))
+                     for c, v in zip(self.outputs, y)]
+            for q, e in errs:
+                if not np.isfinite(e):
+                    continue
+                for a, d in zip(self.axes, dx):
+                    if d:
+                        recent = self.curvature.setdefault((q, a), deque())
+                        recent.append(e/d2)
+                        if len(recent) > self.window:
+                            recent.popleft()
+            self.checks += 1
+        self._grow("X", self.n, self._logp(point))
+        self._grow("logcost", self.n, np.log(record["cost"]))
+        self._grow("sens", self.n, [record["sensitivities"][a]
+                                    for a in self.axes])
+        self._grow("Y", self.n, y)
+        self.n += 1
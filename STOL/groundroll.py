@@ -0,0 +1,80 @@
+" closed-form ground roll of takeoff and landing over NumPy arrays "
+import numpy as np
+from numpy import pi
+
+# pylint: disable=invalid-name
+
+def ground_roll(A, B, V):
+    """ distance to change speed between 0 and V with acceleration A - B*v**2
+
+    Masked on the sign of B, with the B~0 limit V**2/2/|A|.  inf where V is
+    never reached (or the aircraft never stops).
+    """
+    A, B, V = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                    for x in (A, B, V)])
+    S = np.full(A.shape, np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = -B/A*V**2
+        zero = np.abs(x) < 1e-8
+        pos = (B > 0) & ~zero & (x > -1)
+        neg = (B < 0) & ~zero & (x > -1)
+        S[pos] = np.abs(np.log1p(x[pos])/2./B[pos])
+        S[neg] = np.abs(np.log1p(x[neg])/2./B[neg])
+        S[zero] = 0.5*V[zero]**2/np.abs(A[zero])
+    return S
+
+def gr_landing_array(TW, mu, WS, CLmax, AR, e=0.8, CDA=0.024, cdp=0.05):
+    """ landing ground roll over arrays, inputs broadcast against each other
+
+    TW is reverse thrust to weight and WS is in lbf/ft^2.  Returns a dict of
+    arrays A, B, VTD (touchdown speed), CDg, S [ft] and gload.
+    """
+    g = 9.8
+    rho = 1.225
+    TW, mu, WS, CLmax, AR, e = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (TW, mu, WS, CLmax, AR, e)])
+    WS = WS*47.8803
+
+    A = -g*(TW + mu)
+    CDg = CDA + cdp + CLmax**2/pi/AR/e
+    B = g*0.5*rho*1./WS*(CDg - mu*CLmax)
+    Vtd = 1.2*(2*WS/rho/CLmax)**0.5
+
+    S = ground_roll(A, B, Vtd)
+    gload = 0.5*Vtd**2/g/S
+
+    return {"A": A, "B": B, "VTD": Vtd, "CDg": CDg, "S": S*3.28084,
+            "gload": gload}
+
+def gr_takeoff_array(TW, mu, WS, CLmax, AR, e=0.8, cda=0.024, cdp=0.025,
+                     fref=1.3, sp=False):
+    """ takeoff ground roll over arrays, mirroring stol.TakeOff
+
+    TW is takeoff thrust to weight and WS is in lbf/ft^2.  sp=True includes
+    the lift relief of the signomial TakeOff.  Returns a dict of arrays A, B,
+    VTD (liftoff speed fref*Vstall), CDg, S [ft] and gload.
+    """
+    g = 9.81
+    rho = 1.225
+    TW, mu, WS, CLmax, AR, e = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (TW, mu, WS, CLmax, AR, e)])
+    WS = WS*47.8803
+
+    A = g*(TW - mu)
+    CDg = cda + cdp + CLmax**2/pi/AR/e
+    if sp:
+        B = g*0.5*rho/WS*(CDg - mu*CLmax)
+    else:
+        B = g*0.5*rho/WS*CDg
+    Vto = fref*(2*WS/rho/CLmax)**0.5
+
+    S = np.where(A > 0, ground_roll(A, B, Vto), np.inf)
+    gload = 0.5*Vto**2/g/S
+
+    return {"A": A, "B": B, "VTD": Vto, "CDg": CDg, "S": S*3.28084,
+            "gload": gload}
+
+def gr_landing(TW, mu, WS, CLmax, AR, e=0.8, CDA=0.024, cdp=0.05):
+    " scalar gr_landing_array "
+    params = gr_landing_array(TW, mu, WS, CLmax, AR, e, CDA, cdp)
+    return dict((k, float(v)) for k, v in params.items())
@@ -1,5 +1,5 @@
 " Landing distance model "
-from numpy import pi, log
+from numpy import pi
 import pandas as pd
 import os
 from gpkit import Variable, Model, units, SignomialsEnabled
@@ -7,7 +7,7 @@ from gpkit.constraints.tight import Tight as TCS
 from gpfit.fit_constraintset import FitCS
 from gpkit.tools.tools import te_exp_minus1 as em1
 from flightstate import FlightState
-from stol_aircraft import testAircraft, HelioCourier
+from groundroll import gr_landing
 
 class dummy(Model):
     def setup(self):
@@ -58,10 +58,17 @@ class Landing(Model):
         df = pd.read_csv(path + os.sep + "logfit.csv")
         fd = df.to_dict(orient="records")[0]
 
+        self.Slnd = Slnd
+        self.CLland = CLland
+        self.fref = f_ref
+
+        W = aircraft.W
+        S = aircraft.S
+        AR = aircraft.wing.planform.AR
+
         constraints = [
-            T_rev == aircraft["P_{shaft-max}"]*etaprop/fs["V"],
-            Vstall == (2.*aircraft.topvar("W")/fs["\\rho"]/aircraft["S"]
-                       / CLland)**0.5,
+            T_rev == aircraft.Pshaftmax*etaprop/fs["V"],
+            Vstall == (2.*W/fs["\\rho"]/S/CLland)**0.5,
             fs["V"] >= f_ref*Vstall,
             V_ref == fs["V"],
             Slnd >= msafety*Sgr,
@@ -70,54 +77,26 @@ class Landing(Model):
 
         with SignomialsEnabled():
             constraints.extend([
-                TCS([(B*aircraft.topvar("W")/g + 0.5*fs["\\rho"]*aircraft["S"]
-                      * CDg >= 0.5*fs["\\rho"]*aircraft["S"]*mu*CLland)]),
-                TCS([A/g <= T_rev/aircraft.topvar("W") + mu]),
-                CDg <= cda + cdp + CLland**2/pi/aircraft["AR"]/aircraft["e"],
+                TCS([(B*W/g + 0.5*fs["\\rho"]*S
+                      * CDg >= 0.5*fs["\\rho"]*S*mu*CLland)]),
+                TCS([A/g <= T_rev/W + mu]),
+                CDg <= cda + cdp + CLland**2/pi/AR/aircraft.e,
                 ])
 
         return constraints, fs
 
-def gr_landing(TW, mu, WS, CLmax, AR, e=0.8, CDA=0.024, cdp=0.05):
-
-    g = 9.8
-    rho = 1.225
-    WS *= 47.8803
-
-    A = -g*(TW + mu)
-    CDg = CDA + cdp + CLmax**2/pi/AR/e
-    B = g*0.5*rho*1./WS*(CDg - mu*CLmax)
-    Vtd = 1.2*(2*WS/rho/CLmax)**0.5
-
-    if B > 0:
-        S = 1./2./B*log(1 - B/A*Vtd**2)
-    elif B < 0:
-        S = -1./2./B*log(A/(A - B*Vtd**2))
-
-    gload = 0.5*Vtd**2/g/S
-    S *= 3.28084
-
-    params = {"A": A, "B": B, "VTD": Vtd, "CDg": CDg, "S": S, "gload": gload}
-    return params
-
 if __name__ == "__main__":
-    # ac = dummy()
-    # M = Landing(ac)
-    # M.cost = M["S_{land}"]
-    # sol = M.localsolve("mosek")
-    # print sol.table()
+    # the signomial Landing inside the Mission it is used by
+    from stol import Mission, baseline
+    from warmstart import warm_localsolve
+    from solvers import get_solver
+    M = Mission(sp=True)
+    baseline(M)
+    M.cost = M.aircraft.W
+    sol, _ = warm_localsolve(M, get_solver())
+    print "S_land: %4.0f ft  CL_land: %.2f  f_ref: %.2f" % (
+        sol(M.landing.Slnd).magnitude, sol(M.landing.CLland),
+        sol(M.landing.fref))
 
     prms = gr_landing(TW=0, mu=0.5, WS=15, CLmax=4.0, AR=8)
-
-    # ac = testAircraft()
-    # M = Landing(ac)
-    # M.cost = M["S_{land}"]
-    # sol = M.localsolve("mosek_cli")
-    # #sol = M.debug("mosek")
-    # print sol.table()
-
-    #hc = HelioCourier()
-    #M  = Landing(hc)
-    ##M.cost = 1/M["S_{land}"]
-    #sol    = M.solve("mosek")
-    #print sol.table()
+    print "closed-form ground roll at W/S = 15 lbf/ft^2: %4.0f ft" % prms["S"]
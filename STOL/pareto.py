@@ -0,0 +1,167 @@
+" weight versus trip cost Pareto fronts by epsilon-constraint solves "
+import multiprocessing
+import numpy as np
+from gpkit import Variable, Model
+from stol import Mission
+from template import axis_var, axis_value
+from solvers import get_solver
+
+# pylint: disable=invalid-name, global-statement, broad-except
+
+_MODEL = None
+
+class EpsilonMission(object):
+    """ Mission(costModel=True) minimizing Cost_per_trip with W <= Wcap
+
+    solve() returns the weight, the cost and the slope dlog(cost)/dlog(W)
+    of the front at that point, which is the sensitivity of the cost to
+    Wcap.
+    """
+    def __init__(self, subs=None, solver=None):
+        self.mission = Mission(costModel=True)
+        if subs:
+            subs(self.mission)
+        self.W = self.mission.aircraft.W
+        self.Wcap = Variable("W_{cap}", 1e9, "lbf", "cap on MTOW")
+        self.model = Model(self.mission["Cost_per_trip"],
+                           [self.mission, self.W <= self.Wcap])
+        self.solver = solver or get_solver()
+
+    def substitute(self, point):
+        " set the axis values of point (dict of axis name: value) "
+        for name, value in point.items():
+            self.model.substitutions[axis_var(self.mission, name)] = (
+                axis_value(self.mission, name, value))
+
+    def wmin(self, point):
+        " lightest feasible W at point "
+        self.substitute(point)
+        cost = self.model.cost
+        self.model.substitutions[self.Wcap] = 1e9
+        self.model.cost = self.W
+        try:
+            sol = self.model.solve(self.solver, verbosity=0)
+        finally:
+            self.model.cost = cost
+        return float(sol(self.W).magnitude)
+
+    def solve(self, point, Wcap):
+        " (W, cost, slope) of the cheapest design with W <= Wcap "
+        self.substitute(point)
+        self.model.substitutions[self.Wcap] = Wcap
+        sol = self.model.solve(self.solver, verbosity=0)
+        return (float(sol(self.W).magnitude), float(sol["cost"]),
+                float(sol["sensitivities"]["constants"][self.Wcap]))
+
+def _init_worker(kw):
+    " build the epsilon-constraint Mission held by this worker process "
+    global _MODEL
+    _MODEL = EpsilonMission(**kw)
+
+def _task(args):
+    " ('wmin', point) or ('eps', point, Wcap); None if the solve failed "
+    try:
+        if args[0] == "wmin":
+            return _MODEL.wmin(args[1])
+        return _MODEL.solve(args[1], args[2])
+    except Exception:
+        return None
+
+def _gap(a, b):
+    """ (log W, gap) at the intersection of the tangents of front points a
+    and b, (log W, log cost, slope) each; the gap between chord and
+    tangents bounds the error of interpolating the convex front there """
+    (xa, ya, sa), (xb, yb, sb) = a, b
+    if sa - sb >= -1e-12:
+        return 0.5*(xa + xb), 0.
+    x = (yb - ya + sa*xa - sb*xb)/(sa - sb)
+    x = min(max(x, xa), xb)
+    chord = ya + (yb - ya)*(x - xa)/(xb - xa)
+    return x, chord - (ya + sa*(x - xa))
+
+def pareto_fronts(points, subs=None, tol=1e-3, max_points=30,
+                  processes=None, solver=None):
+    """ MTOW versus Cost_per_trip front at each of points
+
+    Arguments
+    ---------
+    points      list of dicts of axis name: value, e.g. runway and range
+    subs        function applied to each Mission, e.g. stol.baseline
+    tol         accepted log-cost gap between the front and its piecewise
+                linear interpolation
+    max_points  solves per front after its two ends
+    processes   pool size, 1 to solve in this process
+
+    The front of each point runs from the lightest design to the cheapest.
+    The ends are solved first.  Each round then solves, for every front at
+    once, the interval whose tangents leave the largest gap, at the
+    tangent intersection, until every gap is below tol.  The log cost of
+    a GP optimum is convex in log Wcap, so the gap is an upper bound on
+    the interpolation error.
+
+    Returns a list (one per point) of dicts of "W", "cost" and "slope"
+    arrays sorted by W, empty where the point is infeasible.
+    """
+    kw = {"subs": subs, "solver": solver}
+    if processes == 1:
+        _init_worker(kw)
+        pmap = map
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker, (kw,))
+        pmap = pool.map
+    try:
+        wmin = pmap(_task, [("wmin", p) for p in points])
+        live = [i for i, w in enumerate(wmin) if w is not None]
+        ends = pmap(_task, [("eps", points[i], Wcap) for i in live
+                            for Wcap in (wmin[i]*(1 + 1e-4), 1e9)])
+        fronts = dict((i, []) for i in range(len(points)))
+        for k, i in enumerate(live):
+            fronts[i] = [(np.log(e[0]), np.log(e[1]), e[2])
+                         for e in ends[2*k:2*k + 2] if e is not None]
+        for _ in range(max_points):
+            todo = []
+            for i in live:
+                front = sorted(set(fronts[i]))
+                fronts[i] = front
+                gaps = [_gap(a, b) for a, b in zip(front[:-1], front[1:])]
+                if gaps:
+                    x, gap = max(gaps, key=lambda g: g[1])
+                    if gap > tol:
+                        todo.append((i, x))
+            if not todo:
+                break
+            new = pmap(_task, [("eps", points[i], np.exp(x))
+                               for i, x in todo])
+            for (i, _), res in zip(todo, new):
+                if res is not None:
+                    fronts[i].append((np.log(res[0]), np.log(res[1]),
+                                      res[2]))
+        if pool:
+            pool.close()
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    out = []
+    for i in range(len(points)):
+        front = np.array(sorted(set(fronts[i]))).reshape(-1, 3)
+        out.append({"W": np.exp(front[:, 0]), "cost": np.exp(front[:, 1]),
+                    "slope": front[:, 2]})
+    return out
+
+if __name__ == "__main__":
+    from itertools import product
+    import matplotlib.pyplot as plt
+    POINTS = [{"RNWY": s, "RNG": r} for s, r in product([300, 500],
+                                                         [50, 100, 150])]
+    fig, ax = plt.subplots()
+    for PT, FRONT in zip(POINTS, pareto_fronts(POINTS)):
+        ax.plot(FRONT["W"], FRONT["cost"], "o-",
+                label="%d ft, %d nmi" % (PT["RNWY"], PT["RNG"]))
+    ax.set_xlabel("Max Takeoff Weight [lbf]")
+    ax.set_ylabel("Cost per trip [USD]")
+    ax.legend(fontsize=12)
+    ax.grid()
+    fig.savefig("pareto.pdf", bbox_inches="tight")
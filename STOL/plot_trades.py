@@ -2,111 +2,60 @@ import matplotlib.pyplot    as plt
 import numpy                as np
 from itertools import cycle
 from matplotlib.backends.backend_pdf import PdfPages
-class out_data():
-    def __init__(self):
-        pass
-    
+from store import ResultCube
+
+_CUBES = {}
+
+def select(folder, column, RNWY, RNG, PAY, VCR, gLND):
+    """ column of the results in folder at the sweep values, one axis per
+    sequence-valued argument in RNWY, RNG, PAY, VCR, GLND order, NaN where a
+    point is missing or failed """
+    if folder not in _CUBES:
+        _CUBES[folder] = ResultCube.load(folder)
+    out = _CUBES[folder].sel(column, RNWY=RNWY, RNG=RNG, PAY=PAY, VCR=VCR,
+                             GLND=gLND)
+    if np.isnan(out).any():
+        print "%d of %d points missing" % (np.isnan(out).sum(), out.size)
+    return out
 
-def read_file(filename):
-    fid = open(filename, 'r')
-    data =  out_data()
-    for line in fid:
-        if ':' in line and not 'Warning' in line:
-            #print '___'
-            l1 = line.split(':')
-            #print l1
-            l =  l1[1].split()
-            if not 'S_gr' in l1[0] :
-                #print l
-                setattr(data, l1[0], float(l[0]))
-
-
-    fid.close()
-    #print data
-    return data
-
-def get_filename(folder, RNWY, RNG, PAY, VCR, gLND):
-    return "%s/RNWY_%4.0f_RNG_%4.0f_PAY_%4.0f_V_%3.0f_GLND_%3.0f.sum" % \
-                            (folder, RNWY, RNG, PAY, VCR, gLND*10)
 def plot_weight_payload_range(PAY_RANGE, RNWY, RNG, VCR, gLND, lines):
     
     linecycler = cycle(lines)
 
-    P = len(PAY_RANGE)
-    R = len(RNG)
-    MTO     = np.zeros((P,R))
-    PFEI    = np.zeros((P,R))
     n_pax = [p/195 for p in PAY_RANGE]
+    MTO = select('Analysis', "MTO", RNWY, RNG, PAY_RANGE, VCR, gLND).T
 
     #plt.figure()
     #plt.hold(True)
-    for r in range(R):
-        for p in range(P):
-            filename    = get_filename('Analysis',RNWY, RNG[r], PAY_RANGE[p], VCR, gLND)
-            try:
-                out_dict    = read_file(filename)
-                MTO[p,r]    = out_dict.MTO
-                PFEI[p,r]   = out_dict.PFEI
-            except:
-                print "Error in :%s" %(filename)
-
+    for r in range(len(RNG)):
         plt.plot(n_pax, MTO[:,r],next(linecycler))#, label = 'Range: %3.0f nmi'%RNG[r])
 
 def plot_weight_payload_speed(PAY_RANGE, RNWY, RNG, VCR, gLND, lines):
     
     linecycler = cycle(lines)
 
-    P = len(VCR)
-    R = len(PAY_RANGE)
-    MTO     = np.zeros((P,R))
-    PFEI    = np.zeros((P,R))
     n_pax = [p/195 for p in PAY_RANGE]
+    MTO = select('Analysis', "MTO", RNWY, RNG, PAY_RANGE, VCR, gLND).T
 
     #plt.figure()
     #plt.hold(True)
-    for r in range(R):
-        for p in range(P):
-            filename    = get_filename('Analysis',RNWY, RNG, PAY_RANGE[r], VCR[p], gLND)
-            #try:
-            out_dict    = read_file(filename)
-            MTO[p,r]    = out_dict.MTO
-            PFEI[p,r]   = out_dict.PFEI
-            #except:
-            #    print "Error in :%s" %(filename)
-
+    for r in range(len(PAY_RANGE)):
         plt.plot(VCR, MTO[:,r],next(linecycler), label = 'Payload: %3.0f pax'%n_pax[r])
 
-    
-    
-
     #plt.show()
 
 def plot_cost_payload(PAY_RANGE, RNWY, RNG, VCR, gLND):
     lines = ["k-","k--","k-.","k:"]
     linecycler = cycle(lines)
 
-    P = len(PAY_RANGE)
-    R = len(RNWY)
-    MTO     = np.zeros((P,R))
-    PFEI    = np.zeros((P,R))
-    cost    = np.zeros((P,R))
-    cpsm    = np.zeros((P,R))
-    n_pax = [p/195 for p in PAY_RANGE]
+    n_pax = np.array([p/195 for p in PAY_RANGE])
+    cost = select('Analysis/Cost', "Trip_Cost", RNWY, RNG, PAY_RANGE, VCR,
+                  gLND).T
+    cpsm = cost/(n_pax[:, None]*RNG)
 
     plt.figure()
     plt.hold(True)
-    for r in range(R):
-        for p in range(P):
-
-            filename    = get_filename('Analysis/Cost',RNWY[r], RNG, PAY_RANGE[p], VCR, gLND)
-            out_dict    = read_file(filename)
-            try:
-                MTO[p,r]    = out_dict.MTO
-                PFEI[p,r]   = out_dict.PFEI
-                cost[p,r]   = out_dict.Trip_Cost
-                cpsm[p,r]   = cost[p,r]/(n_pax[p]*RNG)
-            except:
-                print "Error in :%s" %(filename)
+    for r in range(len(RNWY)):
         #plt.plot(n_pax, cost[:,r],next(linecycler), label = '%3.0f ft'%RNWY[r])
         plt.plot(n_pax, cpsm[:,r],next(linecycler), label = '%3.0f ft'%RNWY[r])
 
@@ -0,0 +1,79 @@
+" predict infeasible sweep points before solving them "
+import random
+
+# pylint: disable=invalid-name
+
+# +1 if larger values tighten the mission, -1 if smaller values do
+HARDER = {"RNWY": -1, "RNG": 1, "PAY": 1, "VCR": 1, "GLND": -1}
+
+class InfeasibleScreen(object):
+    """ skips points at least as hard as an already infeasible point
+
+    A shorter runway, longer range, heavier payload, faster minimum speed or
+    lower landing g-loading only tightens the Mission constraints, so a point
+    that is at least as hard in every axis as an infeasible corner is
+    infeasible too.  Axes missing from harder must match exactly.
+
+    Arguments
+    ---------
+    harder      dict of axis name: +1/-1, see HARDER
+    verify      fraction of screened points that are solved anyway; a
+                feasible one removes the corners that predicted it
+    seed        seed of the verification sampling
+    """
+    def __init__(self, harder=None, verify=0., seed=0):
+        self.harder = harder or HARDER
+        self.verify = verify
+        self.random = random.Random(seed)
+        self.corners = []
+        self.skipped = 0
+        self.refuted = 0
+
+    def dominates(self, point, corner):
+        " whether point is at least as hard as corner in every axis "
+        for a, v in corner.items():
+            if a not in point:
+                return False
+            if a in self.harder:
+                if self.harder[a]*(point[a] - v) < 0:
+                    return False
+            elif point[a] != v:
+                return False
+        return True
+
+    def predict(self, point):
+        " whether point is known to be infeasible "
+        return any(self.dominates(point, c) for c in self.corners)
+
+    def screen(self, point):
+        " 'solve', 'skip' or 'verify' (predicted infeasible, solved anyway) "
+        if not self.predict(point):
+            return "solve"
+        if self.verify and self.random.random() < self.verify:
+            return "verify"
+        self.skipped += 1
+        return "skip"
+
+    def record(self, point, status):
+        " learn from the status of a solved point "
+        if status == "infeasible":
+            if not self.predict(point):
+                self.corners = [c for c in self.corners
+                                if not self.dominates(c, point)]
+                self.corners.append(dict(point))
+        elif status == "ok":
+            wrong = [c for c in self.corners if self.dominates(point, c)]
+            if wrong:
+                self.refuted += len(wrong)
+                self.corners = [c for c in self.corners if c not in wrong]
+
+    def order(self, tasks):
+        " (key, point) tasks sorted from easiest to hardest "
+        values = {}
+        for _, point in tasks:
+            for a, v in point.items():
+                values.setdefault(a, set()).add(v)
+        rank = dict((a, dict((v, i) for i, v in enumerate(sorted(vs))))
+                    for a, vs in values.items())
+        return sorted(tasks, key=lambda t: sum(
+            self.harder.get(a, 0)*rank[a][v] for a, v in t[1].items()))
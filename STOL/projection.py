@@ -0,0 +1,78 @@
+" slim results: declared variables and sensitivities as float64 arrays "
+import numpy as np
+
+# pylint: disable=invalid-name
+
+def _name(var):
+    " column name of a variable, varkey or name "
+    return str(getattr(var, "key", var))
+
+class Projection(object):
+    """ the declared scalar outputs of a solution, dropping the rest
+
+    A full solution holds every variable, every sensitivity and its
+    tables, kilobytes of Python objects per point; a projection keeps
+    len(columns) float64 values.  Entries may be Variables or variable
+    names; names keep the projection picklable, so it can be the handler
+    of sweep.run_sweep, where it returns a dict of column: value that
+    store.record_row writes like any other result.  Columns are "cost",
+    then the variables, then the sensitivities as sens(name), as in
+    store.solution_row.
+
+    Arguments
+    ---------
+    variables       variables whose values are kept
+    sensitivities   constants whose log-sensitivities are kept
+    """
+    def __init__(self, variables=(), sensitivities=()):
+        self.variables = list(variables)
+        self.sensitivities = list(sensitivities)
+        self.columns = (["cost"] + [_name(v) for v in self.variables]
+                        + ["sens(%s)" % _name(s) for s in self.sensitivities])
+
+    def __call__(self, sol, key):
+        " run_sweep handler: dict of column: value of sol "
+        return dict(zip(self.columns, self.row(sol)))
+
+    def row(self, sol):
+        " float64 row of sol "
+        senss = sol["sensitivities"]["constants"]
+        values = ([sol["cost"]] + [sol(v) for v in self.variables]
+                  + [senss[s] for s in self.sensitivities])
+        return np.array([float(getattr(v, "magnitude", v)) for v in values])
+
+    def rows(self, sols):
+        " (len(sols), len(columns)) array, NaN rows where a sol is None "
+        out = np.full((len(sols), len(self.columns)), np.nan)
+        for i, sol in enumerate(sols):
+            if sol is not None:
+                out[i] = self.row(sol)
+        return out
+
+    def sample(self, bst, x):
+        """ rows at the values x of the swept variable of an autosweep_1d
+        tree; the tree interpolates the values, the sensitivities are
+        interpolated linearly between its solutions """
+        oracle = bst.sample_at(x)
+        out = np.empty((len(x), len(self.columns)))
+        out[:, 0] = np.asarray(getattr(oracle["cost"], "magnitude",
+                                       oracle["cost"]))
+        for j, v in enumerate(self.variables):
+            out[:, 1 + j] = np.asarray(getattr(oracle(v), "magnitude",
+                                               oracle(v)))
+        if self.sensitivities:
+            xp = np.asarray(getattr(bst.solarray(bst.sweptvar), "magnitude",
+                                    bst.solarray(bst.sweptvar)))
+            order = np.argsort(xp)
+            senss = bst.solarray["sensitivities"]["constants"]
+            for j, s in enumerate(self.sensitivities):
+                out[:, 1 + len(self.variables) + j] = np.interp(
+                    x, xp[order], np.asarray(senss[s])[order])
+        return out
+
+    def column(self, table, var):
+        " the column of table (rows of this projection) holding var "
+        name = var if var == "cost" else _name(var)
+        if name not in self.columns:
+            name = "sens(%s)" % name
+        return table[..., self.columns.index(name)]
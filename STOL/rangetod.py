@@ -1,8 +1,18 @@
 " trade off between aircraft range and take off distance "
+import os
+import sys
+from functools import partial
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import interp1d
 from stol import Mission
+from template import MissionTemplate, axis_var, axis_value
+from cache import SolveCache
+from spec import load_specs, run_specs
+from prescreen import InfeasibleScreen
+from extrapolate import Extrapolator
+from warmstart import Continuation
+from projection import Projection
+from solvers import get_solver
 from gpkit.tools.autosweep import autosweep_1d
 import cPickle as pkl
 plt.rcParams.update({'font.size':19})
@@ -12,15 +22,16 @@ def plot_torange(N, vname, vrange):
     " plot trade studies of weight, range, and TO distance "
 
     model = Mission(sp=False)
-    del model.substitutions["R"]
-    model.substitutions["g_{loading}"] = 1.0
+    del model.substitutions[model.cruise.R]
+    model.substitutions[model.landing.gload] = 1.0
     sto = np.linspace(100, 500, N)
 
     clrs = ["#084081", "#0868ac", "#2b8cbe", "#4eb3d3", "#7bccc4"]*5
     i = 0
     fig, ax = plt.subplots()
     for v in vrange:
-        model.substitutions.update({vname: v})
+        model.substitutions.update({axis_var(model, vname):
+                                    axis_value(model, vname, v)})
         Rknee = plot_wrange(model, sto, 10, plot=False)
         ax.plot(sto, Rknee, color=clrs[i],
                 label="$%s = %.1f$" % (vname, v))
@@ -34,6 +45,16 @@ def plot_torange(N, vname, vrange):
 
     return fig, ax
 
+_TEMPLATES = {}
+
+def get_template(objective="W", costModel=False):
+    " compiled Mission shared by every trade point with the same objective "
+    key = (objective, costModel)
+    if key not in _TEMPLATES:
+        _TEMPLATES[key] = MissionTemplate(costModel=costModel,
+                                          objective=objective)
+    return _TEMPLATES[key]
+
 def run_RNWY_RNG_PAY_V_trade_point(filename, srunway, range_nmi, payload_lbs, min_speed_kts=120):
     """Set up and solve the model for a specified:
         srunway         Runway length, in ft
@@ -46,16 +67,9 @@ def run_RNWY_RNG_PAY_V_trade_point(filename, srunway, range_nmi, payload_lbs, mi
         solution array is returned for futher processing
 
     """
-    M = Mission(sp=False)
-    del M.substitutions["R"]
-    del M.substitutions["W_{pay}"]
-    M.cost = M.aircraft.topvar("W")
-    M.substitutions["V_{min}"] = min_speed_kts
-    M.substitutions.update({"S_{runway}": srunway,
-                            "R": range_nmi,
-                            "W_{pay}": payload_lbs})
-
-    sol = run_single_point(M, filename)
+    sol = get_template().solve({"RNWY": srunway, "RNG": range_nmi,
+                                "PAY": payload_lbs, "VCR": min_speed_kts})
+    write_table(sol, filename)
 
     return sol
 def run_RNWY_RNG_PAY_V_g_trade_point(filename, srunway, range_nmi, payload_lbs, min_speed_kts, glnd):
@@ -70,18 +84,10 @@ def run_RNWY_RNG_PAY_V_g_trade_point(filename, srunway, range_nmi, payload_lbs,
         solution array is returned for futher processing
 
     """
-    M = Mission(sp=False)
-    del M.substitutions["R"]
-    del M.substitutions["W_{pay}"]
-    del M.substitutions["g_{loading}"]
-    M.cost = M.aircraft.topvar("W")
-    M.substitutions["V_{min}"] = min_speed_kts
-    M.substitutions.update({"S_{runway}": srunway,
-                            "R": range_nmi,
-                            "W_{pay}": payload_lbs,
-                            "g_{loading}":glnd})
-
-    sol = run_single_point(M, filename)
+    sol = get_template().solve({"RNWY": srunway, "RNG": range_nmi,
+                                "PAY": payload_lbs, "VCR": min_speed_kts,
+                                "GLND": glnd})
+    write_table(sol, filename)
 
     return sol
 def run_cost_trade_point(filename, srunway, range_nmi, payload_lbs, min_speed_kts, glnd):
@@ -96,18 +102,10 @@ def run_cost_trade_point(filename, srunway, range_nmi, payload_lbs, min_speed_kt
         solution array is returned for futher processing
 
     """
-    M = Mission(sp=False)
-    del M.substitutions["R"]
-    del M.substitutions["W_{pay}"]
-    del M.substitutions["g_{loading}"]
-    M.cost = M["Cost_per_trip"]
-    M.substitutions["V_{min}"] = min_speed_kts
-    M.substitutions.update({"S_{runway}": srunway,
-                            "R": range_nmi,
-                            "W_{pay}": payload_lbs,
-                            "g_{loading}":glnd})
-
-    sol = run_single_point(M, filename)
+    sol = get_template("Cost_per_trip", costModel=True).solve(
+        {"RNWY": srunway, "RNG": range_nmi, "PAY": payload_lbs,
+         "VCR": min_speed_kts, "GLND": glnd})
+    write_table(sol, filename)
 
     return sol
 def run_single_point(M, filename):
@@ -115,20 +113,103 @@ def run_single_point(M, filename):
     Solve a single model, and dump the results of sol.table() into a .out file
     return the solution array for futher processing
     """
-    sol = M.solve("mosek")
-    fname = filename+".out"
-    fid = open(fname, "w+")
-    fid.write(sol.table())
-    fid.close()
+    sol = M.solve(get_solver())
+    write_table(sol, filename)
     return sol
 
+def write_table(sol, filename):
+    " dump the results of sol.table() into a .out file, written atomically "
+    fname = filename+".out"
+    with open(fname + ".tmp", "w") as fid:
+        fid.write(sol.table())
+    os.rename(fname + ".tmp", fname)
+
+
+def solve_at(model, subs):
+    " model.solve after updating its substitutions "
+    model.substitutions.update(subs)
+    return model.solve(get_solver(), verbosity=0)
+
+def find_knee(model, Rmin, Rmax, tol=1e-3, maxiter=30, solve=None):
+    """ range at which the sensitivity of W to R reaches 1
+
+    Illinois (safeguarded regula falsi) iteration on log(R), bracketed by
+    Rmin and Rmax, one solve per step since sensitivities come with every
+    solve.  Stops when the sensitivity is within tol of 1 or the bracket is
+    narrower than tol in log(R).
+
+    solve(subs) returns the solution at the given substitutions, by default
+    solve_at(model, subs); pass Continuation(model).solve for SP models.
+
+    Returns (Rknee, sol at the knee); (nan, None) if the sensitivity stays
+    below 1 up to Rmax, (Rmin, sol) if it is already above 1 at Rmin.
+    The cost and the substitution of R are restored on return.
+    """
+    R = model.cruise.R
+    cost = model.cost
+    oldR = model.substitutions[R] if R in model.substitutions else None
+    model.cost = model.aircraft.W
+    try:
+        solve = solve or partial(solve_at, model)
+        sols = {}
+
+        def f(logR):
+            " sensitivity to R minus one "
+            sols[logR] = solve({R: np.exp(logR)})
+            return sols[logR]["sensitivities"]["constants"][R] - 1
+
+        a, b = np.log(Rmin), np.log(Rmax)
+        fb = f(b)
+        if fb < 0:
+            return np.nan, None
+        fa = f(a)
+        if fa >= 0:
+            return Rmin, sols[a]
+
+        c, side = a, 0
+        for _ in range(maxiter):
+            c = (fa*b - fb*a)/(fa - fb)
+            fc = f(c)
+            if abs(fc) < tol or b - a < tol:
+                break
+            if fc*fb > 0:
+                b, fb = c, fc
+                if side == -1:
+                    fa /= 2.
+                side = -1
+            else:
+                a, fa = c, fc
+                if side == 1:
+                    fb /= 2.
+                side = 1
+
+        return np.exp(c), sols[c]
+    finally:
+        model.cost = cost
+        if oldR is not None:
+            model.substitutions[R] = oldR
+        elif R in model.substitutions:
+            del model.substitutions[R]
 
 def plot_wrange(model, sto, Nr, plot=True):
-    " plot weight vs range "
-    model.cost = model.aircraft.topvar("W")
-    model.substitutions["V_{min}"] = 100
+    """ plot weight vs range
+
+    SP models are solved by continuation along the runway lengths, ranges
+    and knee iterations, each solve starting from the previous one.
+    """
+    R = model.cruise.R
+    W = model.aircraft.W
+    model.substitutions[model.cruise.Vmin] = 100
+    sp = getattr(model, "sp", False)
+    if sp:
+        cont = Continuation(model)
+        solve = cont.solve
+    else:
+        solve = partial(solve_at, model)
 
     Rmin = 25
+    # only what is plotted is kept of each solution
+    project = Projection([W, model.aircraft.Wbatt], [model.landing.fref])
 
     if plot:
         fig, ax = plt.subplots()
@@ -141,45 +222,39 @@ def plot_wrange(model, sto, Nr, plot=True):
     Rknee = []
 
     for s in sto:
-        model.substitutions.update({"S_{runway}": s})
-        model.cost = 1/model["R"]
-        sol = model.solve("mosek")
-        Rmax = sol("R").magnitude - 10
-        model.cost = model[model.aircraft.topvar("W")]
-        bst = autosweep_1d(model, 0.1, model["R"], [Rmin, Rmax])
-        solR = bst.solarray("R")
-        stosens = bst.solarray["sensitivities"]["constants"]["R"]
-        fbatt = bst.solarray("W_{batt}")/bst.solarray(
-            model.aircraft.topvar("W"))
-        wair = bst.solarray(model.aircraft.topvar("W"))
-        lands = bst.solarray["sensitivities"]["constants"][
-            "m_{fac}_Mission/GLanding"]
-
-        f = interp1d(stosens, solR, "cubic")
-        fw = interp1d(stosens, wair, "cubic")
-        fwf = interp1d(stosens, fbatt, "cubic")
-        if 1.0 > max(stosens):
-            Rknee.extend([np.nan])
-            wint = np.nan
-            wbint = np.nan
-        else:
-            Rknee.extend([f(1.0)])
-            wint = fw(1.0)
-            wbint = fwf(1.0)
+        model.cost = 1/R
+        if R in model.substitutions:
+            del model.substitutions[R]
+        sol = solve({model.Srunway: s})
+        Rmax = sol(R).magnitude - 10
+        knee, ksol = find_knee(model, Rmin, Rmax, solve=solve)
+        Rknee.extend([knee])
 
         if plot:
+            wbint = np.nan
+            if ksol is not None:
+                wbint = ksol(model.aircraft.Wbatt)/ksol(W)
+            model.cost = W
+            if sp:
+                solR = np.linspace(Rmin, Rmax, Nr)
+                rows = cont.sweep(R, solR, project)
+                ok = np.isfinite(rows[:, 0])
+                solR, rows = solR[ok], rows[ok]
+            else:
+                solR = np.linspace(Rmin, Rmax, 100)
+                rows = project.sample(autosweep_1d(model, 0.1, R,
+                                                   [Rmin, Rmax],
+                                                   solver=get_solver()),
+                                      solR)
+            lands = project.column(rows, model.landing.fref)
             axs.plot(solR, lands, color=clrs[i],
                      label="$S_{runway} = %d [ft]$" % s)
-            x = np.linspace(Rmin, Rmax, 100)
-            solR = bst.sample_at(x)["R"]
-            fbatt = bst.sample_at(x)["W_{batt}"]/bst.sample_at(x)[
-                model.aircraft.topvar("W")]
-            wair = bst.sample_at(x)[model.aircraft.topvar("W")]
+            wair = project.column(rows, W)
+            fbatt = project.column(rows, model.aircraft.Wbatt)/wair
             ax.plot(solR, wair, color=clrs[i],
                     label="$S_{\\mathrm{runwawy}} = %d [ft]$" % s)
             axv.plot(solR, fbatt, color=clrs[i],
                      label="$S_{\\mathrm{runway}} = %d [ft]$" % s)
-            # ax.plot(Rknee[-1], wint, marker='o', color="k", markersize=5)
             axv.plot(Rknee[-1], wbint, marker='o', color="k", markersize=5)
             i += 1
 
@@ -203,81 +278,39 @@ def plot_wrange(model, sto, Nr, plot=True):
     return ret
 
 
-def print_summary(sol):
-    print "\n\n----Output Summary----\n"
-    print "----Weights Summary----"
-    MTOW = sol["freevariables"]["W_Mission/Aircraft"].magnitude
-    print "MTO: %5.0f lb" % (MTOW)
-    WBat = sol["freevariables"]["W_{batt}"].magnitude
-    WPay = sol["constants"]["W_{pay}"].magnitude
-    print "Battery: %5.0f lbs \t\t %2.1f %%MTOW"%(WBat, WBat/MTOW*100.)
-    print "Payload: %5.0f lbs \t\t %2.1f %%MTOW"%(WPay, WPay/MTOW*100.)
-    WStruct= sol["freevariables"]["W_{struct}"].magnitude
-    Wmotor= sol["freevariables"]["W_{motor}"].magnitude
-    Wwing = sol["freevariables"]["W_Mission/Aircraft/Wing"].magnitude
-    OEW   = WStruct+Wmotor+Wwing
-    print "OEW    : %5.0f lbs \t\t %2.1f %%MTOW"%(OEW, OEW/MTOW*100.)
-    print "Struct : %5.0f lbs \t\t %2.1f %%MTOW"%(WStruct, WStruct/MTOW*100.)
-    print "Motor  : %5.0f lbs \t\t %2.1f %%MTOW"%(Wmotor, Wmotor/MTOW*100.)
-    print "Wing   : %5.0f lbs \t\t %2.1f %%MTOW"%(Wwing, Wwing/MTOW*100.)
-    print "Useful load: %5.0f" % (WBat+WPay)
-
-    print"_______________________\n"
-    print "W/S: %3.1f lbs/ft^2" % (sol["freevariables"]["W/S_Mission/Aircraft"].magnitude)
-    print "P/W: %3.3f hp/lb" % (sol["freevariables"]["P/W"].magnitude)
-    print "PFEI: %3.2f "%(sol["freevariables"]["PFEI"].magnitude)
-    print "b: %3.1f ft"%(sol["freevariables"]["b"].magnitude)
-    print "L/D: %3.1f"%(sol["freevariables"]["C_L"]/sol["freevariables"]["C_D"])
-    print "AR: %3.1f"%(sol["freevariables"]["AR"])
-    print "Cruise CL: %3.3f"%(sol["freevariables"]["C_L"])
-    print "V_REF: %4.1f kts"%(sol["freevariables"]["V_{ref}"].magnitude)
-    print "V_cruise: %4.1f kts"%sol["freevariables"]["V_Mission/Cruise/AircraftPerf/FlightState"].magnitude
-    print "______"
-    print "S_land: %4.0f ft"%(sol["freevariables"]["S_{land}"].magnitude)
-    print "S_gr, l: %4.0f ft"%(sol["freevariables"]["S_{gr}"].magnitude)
-    print "S_TO: %4.0f ft"%(sol["freevariables"]["S_{TO}"].magnitude)
-    print "S_gr, t: %4.0f ft"%(sol["freevariables"]["S_{ground}"].magnitude)
-
 if __name__ == "__main__":
-    import sys
     #RNWY = 250
     #RNG  = 150
     #PAY  = 195*20
     #VCR  = 120
 
-    RNWYs = [300]
-    RNGs  = [50, 100, 150, 200]
-    PAYs  = [p*195 for p in [4,6,8,10,20]]
-    VCRs  = [80, 100, 120, 140, 160]  #Becomes prim. infeasible for 250ft runway, 160 kts, 200nmi range, 3900lbs payload
-    gLNDs  = [.5, .7, 1]
-
-    for RNWY in RNWYs:
-        for RNG in RNGs:
-            for PAY in PAYs:
-                for VCR in VCRs:
-                    for gLND in gLNDs:
-
-                        filename = "Analysis/RNWY_%4.0f_RNG_%4.0f_PAY_%4.0f_V_%3.0f_GLND_%3.0f" % \
-                            (RNWY, RNG, PAY, VCR, gLND*10)
-                        sys.stdout = open(filename+'.sum', 'w+')
-                        try:
-                            sol = run_RNWY_RNG_PAY_V_g_trade_point(filename,RNWY, RNG, PAY, VCR, gLND)
-                            print_summary(sol)
-                        except:
-                            print "---Error---"
+    # python rangetod.py <tol> predicts smooth points within tol instead
+    extrapolate = None
+    if len(sys.argv) > 1:
+        extrapolate = Extrapolator(float(sys.argv[1]), outputs=("MTO",))
+
+    # the grid is defined in sweeps/rangetod.json; finished points of an
+    # interrupted run are skipped
+    specs = load_specs(os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), "sweeps", "rangetod.json"))
+    for record in run_specs(specs, cache=SolveCache(),
+                            screen=InfeasibleScreen(verify=0.05),
+                            extrapolate=extrapolate, profile=True):
+        if record["status"] != "ok":
+            print "%s: %s" % (record["point"], record["error"])
     """
     M = Mission(sp=False)
-    del M.substitutions["R"]
+    del M.substitutions[M.cruise.R]
     Figs = plot_wrange(M, [100, 200, 350, 500], 10, plot=True)
     Figs[0].savefig("mtowrangew.pdf", bbox_inches="tight")
     Figs[1].savefig("landingsens.pdf", bbox_inches="tight")
     Figs[2].savefig("vrange.pdf", bbox_inches="tight")
-    Fig, _ = plot_torange(20, "W_{pay}", [800])
+    Fig, _ = plot_torange(20, "PAY", [800])
     Fig.savefig("rangetodwpay.pdf", bbox_inches="tight")
-    Fig, _ = plot_torange(20, "g_{loading}", [1, .7, .5])
+    Fig, _ = plot_torange(20, "landing.gload", [1, .7, .5])
     Fig.savefig("rangetodgland.pdf", bbox_inches="tight")
     """
-    #Fig, _ = plot_torange(20, "C_{L_{land}}", [2.5, 3.5, 4.5])
+    #Fig, _ = plot_torange(20, "landing.CLland", [2.5, 3.5, 4.5])
     #Fig.savefig("rangetodclland.pdf", bbox_inches="tight")
-    #Fig, _ = plot_torange(20, "C_{L_{TO}}", [2.5, 3.5, 4.5])
+    #Fig, _ = plot_torange(20, "takeoff.CLto", [2.5, 3.5, 4.5])
     #Fig.savefig("rangetodclto.pdf", bbox_inches="tight")
@@ -1,4 +1,5 @@
 from stol import Mission
+from solvers import get_solver
 import matplotlib.pyplot as plt
 import numpy as np
 import sys
@@ -67,7 +68,7 @@ def plot_sens(model, result, varnames=None):
 if __name__ == "__main__":
     M = Mission()
     M.cost = M["W"]
-    sol = M.solve("mosek")
+    sol = M.solve(get_solver())
 
     varns = ["W_{pay}", "R", "S_{TO}", "h_{batt}", "(W/S)", "sp_{motor}",
              "AR", "\\eta_{prop}"]
@@ -0,0 +1,175 @@
+" local HTTP server answering design queries from warm Missions "
+import time
+import json
+import argparse
+import threading
+import urllib2
+from collections import OrderedDict
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from template import MissionTemplate, AXIS_NAMES, axis_var
+
+# pylint: disable=invalid-name, broad-except
+
+OUTPUTS = ("aircraft.W", "aircraft.Wbatt", "aircraft.Wstruct",
+           "aircraft.Wmotor")
+
+# variants built at startup: (sp, costModel, objective)
+WARM = ((False, False, "W"), (False, True, "Cost_per_trip"),
+        (True, False, "W"))
+
+def _float(value):
+    " json-ready value of a solution entry "
+    value = getattr(value, "magnitude", value)
+    try:
+        return float(value)
+    except TypeError:
+        return [float(v) for v in value]
+
+class Templates(object):
+    """ MissionTemplates kept in memory, one per (sp, costModel, objective,
+    axes), each used by one request at a time and at most max_solves
+    solving at once
+
+    Past max_templates the least recently used variant is dropped, except
+    the warmed ones.  GP variants are compiled so a query only rescales
+    coefficients; SP variants are solved once at startup and every query
+    starts its localsolve from that solution.
+    """
+    def __init__(self, max_solves=2, max_templates=8):
+        self.templates = OrderedDict()
+        self.locks = {}
+        self.pinned = set()
+        self.max_templates = max_templates
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_solves)
+
+    @staticmethod
+    def key(sp=False, costModel=False, objective="W", axes=()):
+        """ variant sweeping AXIS_NAMES and axes; the SP landing has no
+        g-loading axis, so asking for one with sp raises a ValueError """
+        if sp and "GLND" in axes:
+            raise ValueError("GLND is not an axis of the SP landing model")
+        axes = set(axes).union(AXIS_NAMES)
+        if sp:
+            axes.discard("GLND")
+        return (sp, costModel, objective, tuple(sorted(axes)))
+
+    def get(self, sp=False, costModel=False, objective="W", axes=()):
+        " (template, lock) of a variant, built on first use "
+        key = self.key(sp, costModel, objective, axes)
+        with self.lock:
+            if key in self.templates:
+                template = self.templates.pop(key)
+            else:
+                template = MissionTemplate(sp=sp, costModel=costModel,
+                                           objective=objective, axes=key[3])
+                self.locks[key] = threading.Lock()
+            self.templates[key] = template
+            lock = self.locks[key]
+            for old in [k for k in self.templates if k not in self.pinned]:
+                if len(self.templates) <= self.max_templates:
+                    break
+                del self.templates[old]
+                del self.locks[old]
+            return template, lock
+
+    def warm(self, variants=WARM):
+        """ build the given variants, compile the GPs and solve the SPs at
+        their defaults, keeping them from eviction """
+        for sp, costModel, objective in variants:
+            self.pinned.add(self.key(sp, costModel, objective))
+            template, lock = self.get(sp, costModel, objective)
+            with lock:
+                if sp:
+                    template.x0 = dict(
+                        (vk, getattr(v, "magnitude", v)) for vk, v in
+                        template.solve({})["freevariables"].items())
+                else:
+                    template.compile()
+
+    def query(self, request):
+        """ answer a query dict
+
+        Keys: "points" (list of dicts of axis or variable name: value) or
+        "point", optional "sp", "costModel", "objective" and "outputs"
+        (names accepted by template.axis_var).  Returns {"results": [...]}
+        with a status, cost, outputs and solve time per point.  A point
+        with GLND in an sp query raises a ValueError, a 400 over HTTP.
+        """
+        points = request.get("points") or [request.get("point", {})]
+        template, lock = self.get(request.get("sp", False),
+                                  request.get("costModel", False),
+                                  request.get("objective", "W"),
+                                  set().union(*[p.keys() for p in points]))
+        outputs = request.get("outputs", OUTPUTS)
+        results = []
+        with lock:
+            with self.slots:
+                for point in points:
+                    t0 = time.time()
+                    try:
+                        sol = template.solve(point)
+                        res = {"status": "ok", "cost": _float(sol["cost"]),
+                               "outputs": dict(
+                                   (o, _float(sol(axis_var(template.model,
+                                                           o))))
+                                   for o in outputs)}
+                    except Exception as e:
+                        res = {"status": "failed",
+                               "error": "%s: %s" % (type(e).__name__, e)}
+                    res["ms"] = 1e3*(time.time() - t0)
+                    results.append(res)
+        return {"results": results}
+
+class Handler(BaseHTTPRequestHandler):
+    " POST / with a JSON query, see Templates.query "
+    def do_POST(self):  # pylint: disable=invalid-name
+        try:
+            request = json.loads(self.rfile.read(
+                int(self.headers.getheader("content-length", 0))))
+            body, code = self.server.templates.query(request), 200
+        except Exception as e:
+            body, code = {"error": "%s: %s" % (type(e).__name__, e)}, 400
+        data = json.dumps(body)
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class Server(ThreadingMixIn, HTTPServer):
+    " threaded HTTP server holding the templates "
+    daemon_threads = True
+
+    def __init__(self, port=8765, max_solves=2, max_templates=8):
+        HTTPServer.__init__(self, ("127.0.0.1", port), Handler)
+        self.templates = Templates(max_solves, max_templates)
+
+def query(points, port=8765, **options):
+    """ send points (a dict or list of dicts) to a running server
+
+    options are the other query keys (sp, costModel, objective, outputs);
+    returns the list of results.
+    """
+    if isinstance(points, dict):
+        points = [points]
+    options["points"] = points
+    response = urllib2.urlopen("http://127.0.0.1:%d/" % port,
+                               json.dumps(options))
+    return json.load(response)["results"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-solves", type=int, default=2,
+                        help="solves running at the same time")
+    args = parser.parse_args()
+
+    SERVER = Server(args.port, args.max_solves)
+    SERVER.templates.warm()
+    print "serving on 127.0.0.1:%d" % args.port
+    SERVER.serve_forever()
@@ -0,0 +1,55 @@
+" choice of the GP solver used for a run, falling back to open solvers "
+import os
+import gpkit
+from gpkit import Variable, Model
+
+# pylint: disable=invalid-name, broad-except
+
+# most preferred first; cvxopt needs no licence
+PREFERENCE = ("mosek", "mosek_cli", "cvxopt")
+
+_usable = {}
+_chosen = [os.environ.get("STOL_SOLVER")]
+
+def installed():
+    " solvers gpkit was built with, in PREFERENCE order "
+    names = gpkit.settings.get("installed_solvers", [])
+    return [s for s in PREFERENCE if s in names] + [
+        s for s in names if s not in PREFERENCE]
+
+def usable(solver):
+    """ whether solver solves a one-variable GP here
+
+    Catches solvers that are installed but unlicensed; the result is
+    remembered for the rest of the process.
+    """
+    if solver not in _usable:
+        x = Variable("x")
+        try:
+            Model(x, [x >= 1]).solve(solver, verbosity=0)
+            _usable[solver] = True
+        except Exception:
+            _usable[solver] = False
+    return _usable[solver]
+
+def set_solver(solver):
+    " use solver for the rest of the run, None to choose automatically "
+    _chosen[0] = solver
+
+def get_solver():
+    """ solver of this run
+
+    The one given to set_solver or the STOL_SOLVER environment variable,
+    else the first usable installed solver in PREFERENCE order.
+    """
+    if _chosen[0]:
+        return _chosen[0]
+    for s in installed():
+        if usable(s):
+            _chosen[0] = s
+            return s
+    raise RuntimeError("no usable GP solver among %s" % installed())
+
+def available():
+    " every usable installed solver "
+    return [s for s in installed() if usable(s)]
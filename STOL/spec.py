@@ -0,0 +1,179 @@
+" sweeps described by JSON/YAML specs, expanded into tasks and run "
+import json
+import hashlib
+import argparse
+from functools import partial
+from itertools import product
+import numpy as np
+import stol
+from template import axis_var, axis_value
+from sweep import run_sweep
+from store import ResultStore, solution_row, record_row
+
+# pylint: disable=invalid-name
+
+DEFAULTS = {"store": "Analysis", "subs": None, "objective": "W", "sp": False,
+            "costModel": False, "record": None}
+
+def load_specs(path):
+    """ list of specs in a .json or .yaml file (one spec or a list)
+
+    Spec keys
+    ---------
+    axes        dict of axis name (see template.axis_var): list of values
+                or {"start", "stop", "num"} (linear) / {"geom": [...]}
+    subs        "baseline", "advanced", a dict of name: value or null
+    objective   "W", "Cost_per_trip" or any name accepted by axis_var
+    sp          signomial landing/takeoff
+    costModel   include the cost submodel
+    record      columns to keep (variable names, SUMMARY columns or
+                sens(name)), null for every variable
+    store       ResultStore directory of the results
+    """
+    with open(path) as fid:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            specs = yaml.safe_load(fid)
+        else:
+            specs = json.load(fid)
+    if isinstance(specs, dict):
+        specs = [specs]
+    return [dict(DEFAULTS, **s) for s in specs]
+
+def axis_values(values):
+    " list of values of one axis entry of a spec "
+    if isinstance(values, dict):
+        if "geom" in values:
+            return list(np.geomspace(*values["geom"]))
+        return list(np.linspace(values["start"], values["stop"],
+                                values["num"]))
+    return list(values)
+
+def custom_subs(subs, model):
+    " apply a dict of name: value, names as in template.axis_var "
+    for name, value in subs.items():
+        model.substitutions[axis_var(model, name)] = axis_value(model, name,
+                                                                value)
+
+def record_handler(columns, sol, key):
+    " sweep handler keeping only columns of the solution row "
+    row = solution_row(sol)
+    if columns is None:
+        return row
+    keep = {}
+    for c, v in row.items():
+        name = c.split("[")[0]
+        if any(name == n or name.startswith(n + "_") for n in columns):
+            keep[c] = v
+    return keep
+
+def config(spec):
+    """ hashable template configuration of a spec: specs with equal
+    configs share a template, a store and duplicate points """
+    subs = spec["subs"]
+    if isinstance(subs, dict):
+        subs = tuple(sorted(subs.items()))
+    return (spec["store"], subs, spec["objective"], bool(spec["sp"]),
+            bool(spec["costModel"]), tuple(sorted(spec["axes"])))
+
+def task_key(point):
+    " stable key of a point "
+    return ",".join("%s=%r" % (a, float(point[a])) for a in sorted(point))
+
+def serpentine(points, axes):
+    """ points in grid order with every axis reversing direction each time
+    a slower axis steps, so consecutive points differ in one value """
+    values = [sorted(set(p[a] for p in points)) for a in axes]
+    rank = [dict((v, i) for i, v in enumerate(vs)) for vs in values]
+
+    def order(p):
+        " sort key "
+        key, pos = [], 0
+        for a, r, vs in zip(axes, rank, values):
+            i = r[p[a]]
+            i = len(vs) - 1 - i if pos % 2 else i
+            key.append(i)
+            pos = pos*len(vs) + i
+        return key
+    return sorted(points, key=order)
+
+def expand(specs):
+    """ dict of config: (spec, [(key, point)]) over every spec, duplicate
+    points of the same config removed and points in serpentine order; the
+    recorded columns of merged specs are combined """
+    groups = {}
+    for spec in specs:
+        axes = sorted(spec["axes"])
+        cfg = config(spec)
+        if cfg in groups:
+            merged = groups[cfg][0]
+            if merged["record"] is not None and spec["record"] is not None:
+                merged["record"] = sorted(set(merged["record"])
+                                          | set(spec["record"]))
+            else:
+                merged["record"] = None
+        _, points = groups.setdefault(cfg, (dict(spec), {}))
+        for values in product(*[axis_values(spec["axes"][a]) for a in axes]):
+            point = dict(zip(axes, [float(v) for v in values]))
+            points[task_key(point)] = point
+    out = {}
+    for cfg, (spec, points) in groups.items():
+        axes = sorted(spec["axes"])
+        out[cfg] = (spec, [(task_key(p), p)
+                           for p in serpentine(points.values(), axes)])
+    return out
+
+def in_shard(key, shard):
+    " whether task key belongs to shard (i, n) "
+    i, n = shard
+    return int(hashlib.sha1(key).hexdigest(), 16) % n == i
+
+def template_kw(spec):
+    " MissionTemplate arguments of a spec "
+    subs = spec["subs"]
+    if isinstance(subs, dict):
+        subs = partial(custom_subs, subs)
+    elif subs:
+        subs = getattr(stol, subs)
+    return {"subs": subs, "objective": spec["objective"], "sp": spec["sp"],
+            "costModel": spec["costModel"], "axes": sorted(spec["axes"])}
+
+def run_specs(specs, shard=None, **sweep_kw):
+    """ run every task of specs not yet in its store, yielding records
+
+    shard=(i, n) runs only the tasks whose key hashes to i modulo n, so n
+    nodes can split a study; sweep_kw go to sweep.run_sweep, which keeps
+    the serpentine order unless reorder=True is passed.
+    """
+    sweep_kw.setdefault("reorder", False)
+    for spec, tasks in expand(specs).values():
+        store = ResultStore(spec["store"])
+        if shard:
+            tasks = [t for t in tasks if in_shard(t[0], shard)]
+        tasks = store.pending(tasks)
+        kw = dict(sweep_kw, **template_kw(spec))
+        handler = partial(record_handler, spec["record"])
+        for record in run_sweep(tasks, handler=handler, **kw):
+            store.append(record_row(record))
+            yield record
+        store.flush()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("specs", nargs="+", help=".json or .yaml spec files")
+    parser.add_argument("--shard", help="i/n, run one of n shards")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the task count of each group and exit")
+    args = parser.parse_args()
+
+    SPECS = sum([load_specs(f) for f in args.specs], [])
+    SHARD = tuple(int(v) for v in args.shard.split("/")) if args.shard else None
+    if args.dry_run:
+        for SPEC, TASKS in expand(SPECS).values():
+            print "%-16s %-14s %4d tasks" % (SPEC["store"], SPEC["objective"],
+                                             len(TASKS))
+    else:
+        for RECORD in run_specs(SPECS, SHARD, processes=args.processes):
+            if RECORD["status"] != "ok":
+                print "%s: %s" % (RECORD["point"], RECORD["error"])
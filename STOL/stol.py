@@ -1,8 +1,10 @@
 " short take off and landing aircraft model "
 import os
+import numpy as np
 import pandas as pd
 from numpy import pi
-from gpkit import Variable, Model, SignomialsEnabled, units, parse_variables
+from gpkit import (Variable, Model, SignomialsEnabled, Vectorize, units,
+                   parse_variables)
 from gpkitmodels.GP.aircraft.wing.wing import Wing
 from gpkitmodels.GP.aircraft.wing.wing_test import FlightState
 from gpfit.fit_constraintset import FitCS
@@ -11,6 +13,7 @@ from landing import Landing
 from gpkit.constraints.tight import Tight as TCS
 from gpkit.constraints.relax import ConstantsRelaxed
 from cost import Cost
+from solvers import get_solver
 
 # pylint: disable=too-many-locals, invalid-name, unused-variable
 
@@ -112,8 +115,11 @@ class Cruise(Model):
     Pshaft                 [W]       shaft power
     etaprop         0.8    [-]       propellor efficiency
     f_useable       0.8    [-]       Fraction of usable battery energy
+
+    Wbatt is the battery weight available to this leg, the aircraft's
+    battery by default.
     """
-    def setup(self, aircraft):
+    def setup(self, aircraft, Wbatt=None):
         exec parse_variables(Cruise.__doc__)
 
         perf = aircraft.flight_model()
@@ -124,7 +130,7 @@ class Cruise(Model):
         W = self.W = aircraft.W
         CL_max_clean = aircraft.CL_max_clean
         hbatt = aircraft.hbatt
-        Wbatt = aircraft.Wbatt
+        Wbatt = aircraft.Wbatt if Wbatt is None else Wbatt
         etae = aircraft.etae
 
         constraints = [
@@ -217,6 +223,8 @@ class Mission(Model):
     def setup(self, sp=False, costModel=False):
         exec parse_variables(Mission.__doc__)
 
+        self.sp = sp
+        self.costModel = costModel
         self.aircraft = Aircraft()
 
         self.takeoff = TakeOff(self.aircraft, sp=sp)
@@ -315,6 +323,72 @@ class TakeOff(Model):
 
         return constraints, fs
 
+class MultiLegMission(Model):
+    """ N legs flown on one battery charge
+
+    The legs are vectorized in one GP: each has its own range, cruise speed
+    and runway (Srunway, the shorter of its two ends), and shares the
+    aircraft.  Leg i draws the energy of a battery weight Wleg_i and
+    the Wleg sum to at most Wbatt.  The reserve time is split evenly over
+    the legs so that it is carried once per charge, and the cost submodel
+    prices one itinerary as one trip.
+
+    Variables
+    ---------
+    msafety     1.4     [-]         safety margin
+    """
+    def setup(self, N, sp=False, costModel=False, t_reserve=30.):
+        exec parse_variables(MultiLegMission.__doc__)
+
+        self.N = N
+        self.sp = sp
+        self.costModel = costModel
+        self.aircraft = Aircraft()
+
+        with Vectorize(N):
+            Srunway = self.Srunway = Variable("Srunway", "ft",
+                                              "runway length of each leg")
+            Wleg = self.Wleg = Variable("W_{leg}", "lbf",
+                                        "battery weight used on each leg")
+            self.takeoff = TakeOff(self.aircraft, sp=sp)
+            self.cruise = Cruise(self.aircraft, Wbatt=Wleg)
+            self.climb = Climb(self.aircraft)
+            if sp:
+                self.landing = Landing(self.aircraft)
+            else:
+                self.landing = GLanding(self.aircraft)
+        self.cruise.substitutions[self.cruise.t_reserve] = t_reserve/N
+        self.mission = [self.cruise, self.takeoff, self.climb, self.landing]
+        if costModel:
+            self.mission.extend([Cost(self.aircraft)])
+
+        constraints = [self.aircraft.Pshaftmax >= self.cruise.Pshaft,
+                       self.aircraft.Wbatt >= Wleg.sum(),
+                       Srunway >= msafety*self.takeoff.Sto,
+                       Srunway >= msafety*self.landing.Slnd]
+
+        return constraints, self.aircraft, self.mission
+
+def itinerary(ranges, runways, subs=None, sp=False, costModel=False):
+    """ MultiLegMission flying ranges [nmi] between stops with runways [ft]
+
+    runways has one more entry than ranges; each leg must use the shorter
+    runway of its departure and arrival.  subs (e.g. baseline) is applied
+    before the legs are set.
+    """
+    M = MultiLegMission(len(ranges), sp=sp, costModel=costModel)
+    if subs:
+        subs(M)
+    M.substitutions.update({
+        M.cruise.R: np.array(ranges, dtype=float),
+        M.Srunway: np.minimum(runways[:-1], runways[1:]).astype(float)})
+    return M
+
+def vectorized_mission(N, sp=False, costModel=False):
+    " N independent Missions solved as one GP, every variable an N-vector "
+    with Vectorize(N):
+        return Mission(sp=sp, costModel=costModel)
+
 def baseline(model):
     " sub in baseline parameters "
     model.substitutions.update({
@@ -325,8 +399,10 @@ def baseline(model):
         model.aircraft.sp_motor: 7./9.81,
         model.landing.fref: 1.3,
         model.takeoff.fref: 1.3,
-        model.landing.gload: 0.4, model.takeoff.CLto: 4.0,
+        model.takeoff.CLto: 4.0,
         model.landing.CLland: 3.5})
+    if not model.sp:
+        model.substitutions.update({model.landing.gload: 0.4})
 
 def advanced(model):
     " sub in advanced tech params "
@@ -338,8 +414,10 @@ def advanced(model):
         model.aircraft.sp_motor: 7./9.81*1.2,
         model.landing.fref: 1.1,
         model.takeoff.fref: 1.1,
-        model.landing.gload: 0.7, model.takeoff.CLto: 5.0,
+        model.takeoff.CLto: 5.0,
         model.landing.CLland: 4.5})
+    if not model.sp:
+        model.substitutions.update({model.landing.gload: 0.7})
 
 if __name__ == "__main__":
     SP = False
@@ -348,14 +426,16 @@ if __name__ == "__main__":
     M.cost = M[M.aircraft.W]
     #M.cost = M["Cost_per_trip"]
     if SP:
-        sol = M.localsolve("mosek")
+        from warmstart import warm_localsolve
+        sol, info = warm_localsolve(M, get_solver(), compare=True)
+        print "GP solves: %d warm, %d cold" % (info["warm"], info["cold"])
     else:
-        sol = M.solve("mosek")
+        sol = M.solve(get_solver())
     print sol.table()
 
     baseline(M)
-    solbase = M.solve("mosek")
+    solbase = M.solve(get_solver())
 
     advanced(M)
-    soladv = M.solve("mosek")
+    soladv = M.solve(get_solver())
 
@@ -0,0 +1,296 @@
+" columnar store of sweep results in .npz chunks "
+import os
+import json
+import numpy as np
+
+# pylint: disable=invalid-name
+
+SENSITIVITIES = ("Srunway", "R", "Npax", "Vmin", "gload", "hbatt", "CLto",
+                 "CLland", "sp_motor")
+
+# short columns used by the plots, named as in the old .sum files
+SUMMARY = {"MTO": "W_Mission/Aircraft", "PFEI": "PFEI",
+           "Trip_Cost": "Cost_per_trip"}
+
+TEXT = ("key", "status", "error")
+
+# coordinate columns of a sweep, as written by record_row
+AXES = ("RNWY", "RNG", "PAY", "VCR", "GLND")
+
+def _add(row, name, value):
+    " add a scalar or vector value to row, vectors as name[i] columns "
+    value = np.asarray(getattr(value, "magnitude", value), dtype=float)
+    if value.size == 1:
+        row[name] = float(value)
+    else:
+        for i, v in enumerate(value.ravel()):
+            row["%s[%d]" % (name, i)] = float(v)
+
+def solution_row(sol, sensitivities=SENSITIVITIES):
+    """ flat dict of floats: every free variable and constant, the SUMMARY
+    columns and the sensitivities to the named constants as sens(name) """
+    row = {}
+    for group in ("freevariables", "constants"):
+        for vk, v in sol[group].items():
+            _add(row, str(vk), v)
+    for col, name in SUMMARY.items():
+        try:
+            _add(row, col, sol["variables"][name])
+        except KeyError:
+            pass
+    senss = sol["sensitivities"]["constants"]
+    for name in sensitivities:
+        try:
+            _add(row, "sens(%s)" % name, senss[name])
+        except KeyError:
+            pass
+    return row
+
+def row_handler(sol, key):
+    " sweep handler returning the stored row of a solution "
+    return solution_row(sol)
+
+def record_row(record):
+    """ row of a sweep record: key, status, error, coordinates, results and
+    the time(phase)/n(stat) profiling columns """
+    row = {"key": str(record["key"]), "status": record["status"],
+           "error": record.get("error", "")}
+    row.update(record["point"])
+    if record.get("cost") is not None:
+        row["cost"] = record["cost"]
+    if record.get("screened"):
+        row["screened"] = 1.
+    if record.get("extrapolated"):
+        row["extrapolated"] = 1.
+        row["error_estimate"] = record["error_estimate"]
+    row.update(record.get("result") or {})
+    for phase, t in (record.get("timings") or {}).items():
+        row["time(%s)" % phase] = t
+    for name, n in (record.get("stats") or {}).items():
+        row["n(%s)" % name] = n
+    return row
+
+class ResultStore(object):
+    """ append-only columnar store of sweep rows
+
+    Rows are buffered and written as numbered .npz chunks, one float64 array
+    per column (NaN where a row lacks the column) and string arrays for the
+    TEXT columns.  load() reads every chunk back as whole arrays.
+
+    Every appended row is also written to journal.jsonl and synced to disk
+    before append returns, and the journal is cleared once its rows are in
+    a chunk, so rows survive a crash between flushes.  The first append,
+    done() or pending() recovers the journal (dropping a torn last line and
+    rows already in a chunk) and tells a restarted sweep which points are
+    finished; load() alone leaves the journal untouched.  Points that were
+    being solved were never journaled and are pending again, and so are
+    points whose solve failed and points the prescreen skipped (the
+    "screened" column), which were predicted infeasible but never solved.  Chunks are written under a tmp_ name and
+    renamed, so a crash mid-write leaves no partial chunk; the chunk and
+    then the directory are synced before the journal is cleared.
+    """
+    def __init__(self, directory, chunk_rows=1000, sync=True):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.sync = sync
+        self.rows = []
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        self.journal = None
+
+    def _open(self):
+        " recover and open the journal on first use "
+        if self.journal is None:
+            self._recover()
+            self.journal = open(self.journal_path, "a")
+
+    def _recover(self):
+        " buffer the journaled rows that are not in a chunk yet "
+        if not os.path.exists(self.journal_path):
+            return
+        stored = set(self.load(["key"])["key"]) if self.chunks() else set()
+        rows = []
+        with open(self.journal_path) as fid:
+            for line in fid:
+                if not line.endswith("\n"):
+                    break
+                row = json.loads(line)
+                if row.get("key") not in stored:
+                    rows.append(row)
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w") as fid:
+            for row in rows:
+                fid.write(json.dumps(row) + "\n")
+            fid.flush()
+            os.fsync(fid.fileno())
+        os.rename(tmp, self.journal_path)
+        self.rows = rows
+
+    def done(self):
+        """ keys of every stored or journaled row that was solved, i.e. not
+        failed and not screened """
+        self._open()
+        keys = set(r.get("key") for r in self.rows
+                   if r.get("status") != "failed" and not r.get("screened"))
+        if self.chunks():
+            data = self.load(["key", "status", "screened"])
+            keys.update(data["key"][(data["status"] != "failed")
+                                    & (data["screened"] != 1)])
+        return keys
+
+    def pending(self, tasks):
+        " (key, point) tasks whose key is not done "
+        done = self.done()
+        return [t for t in tasks if str(t[0]) not in done]
+
+    def chunks(self):
+        " chunk file names in write order "
+        return sorted(f for f in os.listdir(self.directory)
+                      if f.startswith("chunk_") and f.endswith(".npz")
+                      and f[6:-4].isdigit())
+
+    def append(self, row):
+        " journal and buffer a row, writing a chunk every chunk_rows rows "
+        self._open()
+        self.journal.write(json.dumps(row) + "\n")
+        self.journal.flush()
+        if self.sync:
+            os.fsync(self.journal.fileno())
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        " write buffered rows as the next chunk "
+        if not self.rows:
+            return
+        columns = set()
+        for row in self.rows:
+            columns.update(row)
+        arrays = {}
+        for c in columns:
+            if c in TEXT:
+                arrays[c] = np.array([str(r.get(c, "")) for r in self.rows])
+            else:
+                arrays[c] = np.array([r.get(c, np.nan) for r in self.rows],
+                                     dtype=float)
+        existing = self.chunks()
+        n = int(existing[-1][6:-4]) + 1 if existing else 0
+        name = "chunk_%05d.npz" % n
+        tmp = os.path.join(self.directory, "tmp_" + name)
+        with open(tmp, "wb") as fid:
+            np.savez(fid, **arrays)
+            if self.sync:
+                fid.flush()
+                os.fsync(fid.fileno())
+        os.rename(tmp, os.path.join(self.directory, name))
+        if self.sync:
+            self._sync_directory()
+        self.rows = []
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = open(self.journal_path, "w")
+
+    def _sync_directory(self):
+        " fsync the directory, making a rename in it durable "
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load(self, columns=None):
+        " dict of column: array over every chunk, optionally only columns "
+        chunks = [np.load(os.path.join(self.directory, f))
+                  for f in self.chunks()]
+        names = set(columns or [])
+        if columns is None:
+            for c in chunks:
+                names.update(c.files)
+        data = {}
+        for name in names:
+            parts = []
+            for c in chunks:
+                if name in c.files:
+                    parts.append(c[name])
+                else:
+                    n = len(c[c.files[0]])
+                    parts.append(np.array([""]*n) if name in TEXT
+                                 else np.full(n, np.nan))
+            data[name] = np.concatenate(parts) if parts else np.array([])
+        for c in chunks:
+            c.close()
+        return data
+
+class ResultCube(object):
+    """ result columns as N-d arrays indexed by sweep axis values
+
+    Built in one pass over the rows of ResultStore.load(): each axis holds
+    the sorted distinct values of its column and a column becomes, on
+    first access, an array with one dimension per axis, NaN where a point
+    is missing (or not "ok" with ok_only).  Later rows of the same point
+    win, and rows without a value of a swept axis are dropped.  Every
+    array has one extra cell at the end of each axis that sel() uses for
+    values that were not swept; it is NaN except along an axis no row has
+    a value of, e.g. GLND in an SP sweep, where it holds every row.
+    """
+    def __init__(self, data, axes=AXES, ok_only=True):
+        self.data = data
+        self.axes = tuple(axes)
+        rows = np.ones(len(data[self.axes[0]]), dtype=bool)
+        if ok_only and "status" in data:
+            rows = data["status"] == "ok"
+        coords = [np.asarray(data[a], dtype=float) for a in self.axes]
+        for c in coords:
+            if np.isfinite(c).any():
+                rows &= np.isfinite(c)
+        coords = [c[rows] for c in coords]
+        self.rows = np.nonzero(rows)[0]
+        self.values = [np.unique(c[np.isfinite(c)]) for c in coords]
+        self.index = tuple(np.searchsorted(v, c)
+                           for v, c in zip(self.values, coords))
+        self.shape = tuple(len(v) + 1 for v in self.values)
+        self.arrays = {}
+
+    @classmethod
+    def load(cls, directory, **kwargs):
+        " cube of every column of the store in directory "
+        return cls(ResultStore(directory).load(), **kwargs)
+
+    def __getitem__(self, column):
+        " full array of column, shape len(values)+1 per axis "
+        if column not in self.arrays:
+            a = np.full(self.shape, np.nan)
+            a[self.index] = np.asarray(self.data[column],
+                                       dtype=float)[self.rows]
+            self.arrays[column] = a
+        return self.arrays[column]
+
+    def positions(self, axis, value):
+        " indices of value (scalar or array) along axis, -1 if not swept "
+        values = self.values[self.axes.index(axis)]
+        value = np.asarray(value, dtype=float)
+        if not len(values):
+            return np.full(value.shape, -1, dtype=int)
+        pos = np.clip(np.searchsorted(values, value), 0, len(values) - 1)
+        return np.where(np.isclose(values[pos], value), pos, -1)
+
+    def sel(self, column, **coords):
+        """ column at the given axis values
+
+        Each axis is a scalar (dropped from the result), a sequence (kept,
+        in the order given) or left out (every swept value); the result has
+        the kept axes in self.axes order and NaN where a point is missing.
+        Left-out axes that were not swept at all are dropped.
+        """
+        a = self[column]
+        for k in reversed(range(len(self.axes))):
+            axis = self.axes[k]
+            if axis in coords:
+                a = np.take(a, self.positions(axis, coords[axis]), axis=k)
+            elif not len(self.values[k]):
+                a = np.take(a, -1, axis=k)
+            else:
+                a = np.take(a, np.arange(len(self.values[k])), axis=k)
+        return a
@@ -0,0 +1,128 @@
+" GP-compatible fits of the sized aircraft from stored sweep results "
+import os
+import json
+import numpy as np
+import pandas as pd
+from gpfit.fit import fit
+from gpfit.fit_constraintset import FitCS
+from store import ResultStore
+
+# pylint: disable=invalid-name
+
+INPUTS = ("RNG", "PAY", "RNWY", "VCR")
+
+def column(data, name):
+    " column called name, or whose variable name is name (name_Model...) "
+    if name in data:
+        return data[name]
+    for c in sorted(data):
+        if c.startswith(name + "_"):
+            return data[c]
+    raise KeyError(name)
+
+def runway_required(data):
+    " runway needed by the sized aircraft, msafety*max(Sto, Slnd) "
+    return column(data, "msafety")*np.maximum(column(data, "Sto"),
+                                              column(data, "Slnd"))
+
+TARGETS = {
+    "MTOW": lambda d: column(d, "MTO"),
+    "Wbatt": lambda d: column(d, "Wbatt"),
+    "Trip_Cost": lambda d: column(d, "Trip_Cost"),
+    "Srunway_req": runway_required,
+}
+
+def training_data(data, target, inputs=INPUTS):
+    """ log inputs (d x N), log target (N) and the names of the inputs that
+    vary, over the solved (not extrapolated) ok rows where the target is
+    positive and finite """
+    y = np.asarray(TARGETS[target](data), dtype=float)
+    u = np.array([np.asarray(data[i], dtype=float) for i in inputs])
+    ok = (data["status"] == "ok") & np.isfinite(y) & (y > 0)
+    ok &= np.isfinite(u).all(axis=0) & (u > 0).all(axis=0)
+    if "extrapolated" in data:
+        ok &= data["extrapolated"] != 1
+    u, y = u[:, ok], y[ok]
+    varies = [j for j in range(len(inputs)) if len(np.unique(u[j])) > 1]
+    return (np.log(u[varies]), np.log(y),
+            [inputs[j] for j in varies])
+
+class Surrogate(object):
+    """ max-affine/SMA fits (as in logfit.py) of the sweep outputs
+
+    Each target is fitted with gpfit over the ok rows of a result store and
+    written to <directory>/<target>.csv in the logfit.csv format, next
+    to a manifest recording the inputs, row count and fit errors.  refit()
+    only refits targets that gained at least min_new rows since their last
+    fit, so it can be rerun as sweeps add data.
+
+    Arguments
+    ---------
+    directory   where the fits and manifest.json are written
+    K           number of affine terms
+    ftype       gpfit fit type, "MA", "SMA" or "ISMA"
+    """
+    def __init__(self, directory="Surrogates", K=3, ftype="SMA"):
+        self.directory = directory
+        self.K = K
+        self.ftype = ftype
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as fid:
+                self.manifest = json.load(fid)
+
+    def refit(self, store, targets=None, min_new=1):
+        """ fit targets (default all TARGETS) over the rows of the result
+        directory store; returns dict of refitted target: rms error
+
+        Rows of one store share an objective, so fit designs sized for
+        weight and for cost from their own stores.
+        """
+        data = ResultStore(store).load()
+        errors = {}
+        for target in targets or sorted(TARGETS):
+            try:
+                x, y, names = training_data(data, target)
+            except KeyError:
+                continue
+            if not names:
+                continue
+            old = self.manifest.get(target, {})
+            if (old.get("inputs") == names
+                    and len(y) - old.get("rows", 0) < min_new):
+                continue
+            cn, rms = fit(x, y, self.K, self.ftype)
+            df = cn.get_dataframe()
+            tmp = self._path(target) + ".tmp"
+            df.to_csv(tmp, index=False)
+            os.rename(tmp, self._path(target))
+            self.manifest[target] = {"store": store, "inputs": names,
+                                     "rows": len(y),
+                                     "rms_err": float(rms),
+                                     "max_err": float(df["max_err"][0])}
+            errors[target] = rms
+        with open(self.manifest_path, "w") as fid:
+            json.dump(self.manifest, fid, indent=2, sort_keys=True)
+        return errors
+
+    def _path(self, target):
+        return os.path.join(self.directory, target + ".csv")
+
+    def constraint(self, target, output, inputs):
+        """ FitCS constraining output from inputs, a dict of input name
+        (see INPUTS) to variable or monomial, in the fitted order """
+        fd = pd.read_csv(self._path(target)).to_dict(orient="records")[0]
+        return FitCS(fd, output, [inputs[n] for n in
+                                  self.manifest[target]["inputs"]])
+
+if __name__ == "__main__":
+    SURROGATE = Surrogate()
+    ERRORS = SURROGATE.refit("Analysis", ["MTOW", "Wbatt", "Srunway_req"])
+    ERRORS.update(SURROGATE.refit("Analysis/Cost", ["Trip_Cost"]))
+    for TARGET, ENTRY in sorted(SURROGATE.manifest.items()):
+        print "%-12s %5d rows  RMS error: %.5f  max error: %.5f%s" % (
+            TARGET, ENTRY["rows"], ENTRY["rms_err"], ENTRY["max_err"],
+            "" if TARGET in ERRORS else "  (unchanged)")
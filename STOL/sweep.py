@@ -0,0 +1,198 @@
+" process pool executor for trade sweeps "
+import os
+import time
+import cProfile
+import multiprocessing
+import traceback
+from template import MissionTemplate
+
+# pylint: disable=invalid-name, global-statement, broad-except
+
+_TEMPLATE = None
+_INIT_ERROR = None
+
+# seconds between checks of the tasks in flight
+POLL = 0.05
+
+# default seconds without any finished point before a task is given up
+TIMEOUT = 600.
+
+def _init_worker(template_kw):
+    """ build the warm Mission held by this worker process; an error is
+    kept and raised by every task, since a worker dying in its initializer
+    is respawned by the pool forever """
+    global _TEMPLATE, _INIT_ERROR
+    try:
+        _TEMPLATE = MissionTemplate(**template_kw)
+    except Exception:
+        _INIT_ERROR = traceback.format_exc()
+
+def is_infeasible(error):
+    " whether a solver error reports an infeasible problem "
+    return "infeas" in str(error).lower()
+
+def solve_task(template, task, handler=None, cprofile=None):
+    """ solve one (key, point) task and return its record
+
+    Record keys
+    -----------
+    key         task key, e.g. the output filename
+    point       dict of axis name: value
+    status      "ok", "infeasible" or "failed"
+    cost        objective value
+    sensitivities   dict of axis name: log-sensitivity of the objective
+    result      return value of handler(sol, key)
+    timings     seconds per phase if the template profiles, handler time
+                under "extract"
+    stats       problem size and solver iterations if the template profiles
+    error       exception text for failed points
+    traceback   formatted traceback for failed points
+
+    If cprofile is a directory the solve runs under cProfile and its stats
+    are dumped to <cprofile>/<key>.prof.
+    """
+    key, point = task
+    record = {"key": key, "point": point}
+    profiler = cProfile.Profile() if cprofile else None
+    try:
+        if profiler:
+            profiler.enable()
+        sol = template.solve(point)
+        record["status"] = "ok"
+        record["cost"] = float(sol["cost"])
+        record["sensitivities"] = template.sensitivities(sol)
+        with template.timer("extract"):
+            record["result"] = handler(sol, key) if handler else None
+    except Exception as e:
+        record["status"] = "infeasible" if is_infeasible(e) else "failed"
+        record["error"] = "%s: %s" % (type(e).__name__, e)
+        record["traceback"] = traceback.format_exc()
+    finally:
+        if profiler:
+            profiler.disable()
+            if not os.path.isdir(cprofile):
+                os.makedirs(cprofile)
+            profiler.dump_stats(os.path.join(cprofile, "%s.prof" % key))
+    if template.timings is not None:
+        record["timings"] = dict(template.timings)
+        record["stats"] = dict(template.stats)
+    return record
+
+def _solve_in_worker(args):
+    " pool entry point "
+    if _INIT_ERROR:
+        raise RuntimeError("worker initialization failed:\n" + _INIT_ERROR)
+    return solve_task(_TEMPLATE, *args)
+
+def _screened(screen, task):
+    " record of a task skipped by screen, or None if it must be solved "
+    if screen is None or screen.screen(task[1]) != "skip":
+        return None
+    return {"key": task[0], "point": task[1], "status": "infeasible",
+            "screened": True, "error": "predicted infeasible by prescreen"}
+
+def _extrapolated(extrapolate, task):
+    " record predicted by extrapolate, or None if the task must be solved "
+    if extrapolate is None:
+        return None
+    return extrapolate.extrapolated(task)
+
+def _learn(screen, extrapolate, record):
+    " pass a solved point to screen and extrapolate "
+    if screen is not None:
+        screen.record(record["point"], record["status"])
+    if extrapolate is not None:
+        extrapolate.record(record)
+
+def run_sweep(tasks, processes=None, handler=None, screen=None,
+              extrapolate=None, profile_keys=(), profile_dir="profiles",
+              timeout=TIMEOUT, reorder=True, **template_kw):
+    """ solve (key, point) tasks across a process pool
+
+    Each worker builds one MissionTemplate from template_kw and reuses it
+    for all of its points.  Records (see solve_task) are yielded in
+    completion order.  handler(sol, key) runs in the worker and must be a
+    module level function; its return value is sent back as "result".
+    A projection.Projection of variable names keeps each result to its
+    declared columns.
+
+    screen is an optional prescreen.InfeasibleScreen: tasks are ordered
+    from easiest to hardest (unless reorder=False, which keeps an order the
+    caller already chose), at most two per process are in flight, and
+    points it predicts infeasible are yielded as "screened" records
+    without solving.
+
+    extrapolate is an optional extrapolate.Extrapolator: points it can
+    predict within its tolerance from an already solved neighbour are
+    yielded as "extrapolated" records without solving.
+
+    Pass profile=True (a MissionTemplate option) to get per-phase timings
+    in every record; tasks whose key is in profile_keys are also run under
+    cProfile with stats written to profile_dir.
+
+    processes=1 solves in this process without a pool.  Errors outside
+    solve_task (a failed worker initialization, a result that cannot be
+    pickled) are raised here.  A worker that died or hung takes its task
+    with it, so when no point finishes for timeout seconds the oldest task
+    in flight is given up and yielded as "failed"; timeout=None waits
+    forever.  The pool is terminated at the end, hung workers included.
+    """
+    tasks = list(tasks)
+    if screen is not None and reorder:
+        tasks = screen.order(tasks)
+    if processes == 1:
+        template = MissionTemplate(**template_kw)
+        for task in tasks:
+            record = (_screened(screen, task)
+                      or _extrapolated(extrapolate, task))
+            if record is None:
+                record = solve_task(
+                    template, task, handler,
+                    profile_dir if task[0] in profile_keys else None)
+                _learn(screen, extrapolate, record)
+            yield record
+        return
+
+    window = 2*(processes or multiprocessing.cpu_count())
+    running = []
+    tasks = iter(tasks)
+    exhausted = False
+    pool = multiprocessing.Pool(processes, _init_worker, (template_kw,))
+    try:
+        while True:
+            while len(running) < window and not exhausted:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+                record = (_screened(screen, task)
+                          or _extrapolated(extrapolate, task))
+                if record is not None:
+                    yield record
+                    continue
+                cprofile = profile_dir if task[0] in profile_keys else None
+                running.append((task, pool.apply_async(
+                    _solve_in_worker, ((task, handler, cprofile),))))
+                last = time.time()
+            if not running:
+                break
+            ready = [r for r in running if r[1].ready()]
+            if not ready:
+                running[0][1].wait(POLL)
+                if timeout is not None and time.time() - last > timeout:
+                    task = running.pop(0)[0]
+                    last = time.time()
+                    yield {"key": task[0], "point": task[1],
+                           "status": "failed",
+                           "error": "no point finished in %g s" % timeout}
+                continue
+            last = time.time()
+            for item in ready:
+                running.remove(item)
+                record = item[1].get()
+                _learn(screen, extrapolate, record)
+                yield record
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,239 @@
+" Mission built and compiled once, re-solved for many trade points "
+import time
+from contextlib import contextmanager
+import numpy as np
+from gpkit.solution_array import SolutionArray
+from stol import Mission
+from solvers import get_solver
+
+# pylint: disable=invalid-name, too-many-instance-attributes
+
+AXIS_NAMES = ("RNWY", "RNG", "PAY", "VCR", "GLND")
+
+AXES = {
+    "RNWY": lambda m: m.Srunway,
+    "RNG": lambda m: m.cruise.R,
+    "PAY": lambda m: m.aircraft.Npax,
+    "VCR": lambda m: m.cruise.Vmin,
+    "GLND": lambda m: m.landing.gload,
+}
+
+def axis_var(model, name):
+    """ variable of model swept by axis name
+
+    name is either one of AXES (RNWY, RNG, PAY [lbf], VCR, GLND), a dotted
+    attribute path such as "aircraft.hbatt", or a variable name.
+    """
+    if name in AXES:
+        return AXES[name](model)
+    if name == "W":
+        return model.aircraft.W
+    obj = model
+    try:
+        for attr in name.split("."):
+            obj = getattr(obj, attr)
+        return obj
+    except AttributeError:
+        return model[name]
+
+def axis_value(model, name, value):
+    " substitution value of an axis, payload is converted to seats "
+    if name == "PAY":
+        return value/float(model.substitutions[model.aircraft.Wpax])
+    return value
+
+class MissionTemplate(object):
+    """ Mission that is built and compiled once for a whole sweep
+
+    The compiled GP only depends on the sweep axes through its monomial
+    coefficients, each a monomial in the axis values.  The exponents are
+    found once by compiling at doubled axis values, after which every point
+    rescales the coefficients as cs0*prod((p/p0)**E) and calls the solver
+    directly.  If the coefficients do not scale that way the template falls
+    back to updating substitutions and calling model.solve.
+
+    Arguments
+    ---------
+    sp          use the signomial landing/takeoff (always re-solved)
+    costModel   include the cost submodel
+    objective   "W", "Cost_per_trip" or any name accepted by axis_var
+    subs        function applied to the model, e.g. stol.baseline
+    axes        names of the swept constants, see axis_var
+    solver      solver name passed to gpkit, default solvers.get_solver()
+    cache       optional cache.SolveCache consulted before solving
+    profile     record per-phase timings and problem size of every solve in
+                self.timings and self.stats
+
+    Set x0 (e.g. the freevariables of a stored solution) to start every SP
+    solve from it; a solve that fails from x0 is retried cold.
+    """
+    def __init__(self, sp=False, costModel=False, objective="W", subs=None,
+                 axes=AXIS_NAMES, solver=None, cache=None, profile=False):
+        t0 = time.time()
+        self.sp = sp
+        self.costModel = costModel
+        self.objective = objective
+        self.solver = solver or get_solver()
+        self.cache = cache
+        self.model = Mission(sp=sp, costModel=costModel)
+        if subs:
+            subs(self.model)
+        self.model.cost = axis_var(self.model, objective)
+        self.axes = tuple(axes)
+        self.keys = dict((a, axis_var(self.model, a).key) for a in self.axes)
+        self.defaults = dict(zip(self.axes, self._values()))
+        self.program = None
+        self.cs0 = None
+        self.p0 = None
+        self.E = None
+        self.ncompiles = 0
+        self.nsolves = 0
+        self.x0 = None
+        self.profile = profile
+        self.timings = {"setup": time.time() - t0} if profile else None
+        self.stats = {}
+
+    @contextmanager
+    def timer(self, phase):
+        " add the time spent in the block to self.timings[phase] "
+        t0 = time.time()
+        yield
+        if self.timings is not None:
+            self.timings[phase] = (self.timings.get(phase, 0.)
+                                   + time.time() - t0)
+
+    def _values(self):
+        " current substitution values of the axes "
+        return np.array([float(self.model.substitutions[self.keys[a]])
+                         for a in self.axes])
+
+    def substitute(self, point):
+        " update model substitutions for a point, missing axes use defaults "
+        for a in self.axes:
+            if a in point:
+                v = axis_value(self.model, a, point[a])
+            else:
+                v = self.defaults[a]
+            self.model.substitutions[self.keys[a]] = v
+
+    def _compile(self):
+        " compile the GP at the current substitutions "
+        self.ncompiles += 1
+        with self.timer("compile"):
+            return self.model.gp()
+
+    def compile(self):
+        " compile the GP once and the coefficient exponents of each axis "
+        p0 = self._values()
+        program = self._compile()
+        cs0 = np.array(program.cs, dtype=float)
+        E = np.zeros((len(cs0), len(self.axes)))
+        for j, a in enumerate(self.axes):
+            self.model.substitutions[self.keys[a]] = 2*p0[j]
+            gp = self._compile()
+            self.model.substitutions[self.keys[a]] = p0[j]
+            if gp.exps != program.exps:
+                return self._nocompile()
+            E[:, j] = np.log2(np.array(gp.cs, dtype=float)/cs0)
+
+        for j, a in enumerate(self.axes):
+            self.model.substitutions[self.keys[a]] = 3*p0[j]
+        gp = self._compile()
+        for j, a in enumerate(self.axes):
+            self.model.substitutions[self.keys[a]] = p0[j]
+        if (gp.exps != program.exps or not np.allclose(
+                cs0*np.exp(E.sum(axis=1)*np.log(3)), gp.cs, rtol=1e-9)):
+            return self._nocompile()
+
+        self.program, self.cs0, self.p0, self.E = program, cs0, p0, E
+
+    def _nocompile(self):
+        " coefficients are not monomials in the axes, re-solve every point "
+        self.program = None
+        self.E = False
+
+    def solve(self, point, verbosity=0):
+        """ solve the mission at point, a dict of axis name: value
+
+        Returns the gpkit SolutionArray.  With profile=True, self.timings
+        holds the seconds spent in each phase of this solve (setup is only
+        reported with the first) and self.stats the problem size and
+        solver iterations.
+        """
+        if self.profile and self.nsolves:
+            self.timings, self.stats = {}, {}
+        self.nsolves += 1
+        with self.timer("substitute"):
+            self.substitute(point)
+        if not self.cache:
+            return self._solve(verbosity)
+        with self.timer("cache"):
+            key = self.cache.key(self.model, self.solver)
+            sol = self.cache.get(key)
+        if sol is None:
+            sol = self._solve(verbosity)
+            with self.timer("cache"):
+                self.cache.put(key, sol)
+        elif self.profile:
+            self.stats = {"cached": 1}
+        return sol
+
+    def _solve(self, verbosity):
+        " solve at the current substitutions "
+        if self.sp:
+            with self.timer("solve"):
+                try:
+                    sol = self.model.localsolve(self.solver,
+                                                verbosity=verbosity,
+                                                x0=self.x0)
+                except Exception:  # pylint: disable=broad-except
+                    if self.x0 is None:
+                        raise
+                    sol = self.model.localsolve(self.solver,
+                                                verbosity=verbosity)
+            self._stats(self.model.program.gps[-1],
+                        len(self.model.program.gps))
+            return sol
+        if self.E is None:
+            self.compile()
+        if self.E is False:
+            with self.timer("solve"):
+                sol = self.model.solve(self.solver, verbosity=verbosity)
+            self._stats(self.model.program)
+            return sol
+
+        with self.timer("substitute"):
+            p = self._values()
+            self.program.cs = self.cs0*np.exp(self.E.dot(np.log(p/self.p0)))
+            for a, v in zip(self.axes, p):
+                self.program.substitutions[self.keys[a]] = v
+        with self.timer("solve"):
+            result = self.program.solve(self.solver, verbosity=verbosity)
+        with self.timer("extract"):
+            self.model.process_result(result)
+            sol = SolutionArray()
+            sol.append(result)
+            sol.to_arrays()
+            self.model.solution = sol
+        self._stats(self.program)
+        return sol
+
+    def _stats(self, program, gps=1):
+        " problem size and solver iterations of the last solve "
+        if not self.profile:
+            return
+        out = getattr(program, "solver_out", None) or {}
+        self.stats = {"variables": len(program.varlocs),
+                      "monomials": len(program.cs),
+                      "posynomials": len(program.k),
+                      "gp_solves": gps,
+                      "iterations": out.get("iterations", np.nan)}
+
+    def sensitivities(self, sol):
+        """ dict of axis name: log-sensitivity of the objective in sol
+
+        Payload enters through the seat count, a constant multiple, so its
+        sensitivity is that of Npax.
+        """
+        senss = sol["sensitivities"]["constants"]
+        return dict((a, float(senss[self.keys[a]])) for a in self.axes)
@@ -0,0 +1,36 @@
+" NumPy evaluation of the Cost submodel "
+import numpy as np
+import pytest
+
+cost = pytest.importorskip("cost")
+
+def mass(W):
+    " kg of a weight W [lbf] as the Cost model converts it, W/g "
+    return W*4.4482216152605/9.81
+
+def test_matches_hand_calculation():
+    out = cost.evaluate_cost(100., 500., 400., 210.)
+    energy = mass(400)*210/1000.
+    vehicle = 50000 + mass(100)*360 + mass(500)*150 + energy*150
+    expected = (vehicle*1.1/(1000*10.) + energy*150*1.1/2000.
+                + energy*0.1 + 14 + 50 + 50)
+    assert np.isclose(out["Cost_Vehicle"], vehicle)
+    assert np.isclose(out["Cost_per_trip"], expected)
+
+def test_breakdown_sums_to_total():
+    out = cost.evaluate_cost(100., 500., 400., 210.)
+    assert np.isclose(out["Cost_per_trip"],
+                      out["Cost_battery_per_trip"]
+                      + out["Cost_Energy_per_trip"]
+                      + out["Cost_vehicle_per_trip"] + 14 + 50 + 50)
+
+def test_economics_broadcast():
+    out = cost.evaluate_cost(100., 500., np.array([300., 400.]), 210.,
+                             energy_cost=np.array([[0.1], [0.2], [0.3]]))
+    assert out["Cost_per_trip"].shape == (3, 2)
+    assert (np.diff(out["Cost_per_trip"], axis=0) > 0).all()
+    assert (np.diff(out["Cost_per_trip"], axis=1) > 0).all()
+
+def test_unknown_economics():
+    with pytest.raises(TypeError):
+        cost.evaluate_cost(100., 500., 400., 210., fuel_cost=1.)
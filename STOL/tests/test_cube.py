@@ -0,0 +1,55 @@
+" ResultCube indexing "
+import numpy as np
+from store import ResultCube
+
+def cube(**kwargs):
+    " cube over RNWY x RNG with W = RNWY + RNG, one point failed "
+    rnwy, rng = np.meshgrid([200., 300., 400.], [50., 100.], indexing="ij")
+    data = {"RNWY": rnwy.ravel(), "RNG": rng.ravel(),
+            "W": (rnwy + rng).ravel(),
+            "status": np.array(["ok"]*5 + ["failed"])}
+    return ResultCube(data, axes=("RNWY", "RNG"), **kwargs)
+
+def test_full_slice():
+    W = cube().sel("W")
+    assert W.shape == (3, 2)
+    assert np.allclose(W[:2], [[250, 300], [350, 400]])
+    assert np.isnan(W[2, 1])
+
+def test_ok_only():
+    assert cube(ok_only=False).sel("W", RNWY=400, RNG=100) == 500
+
+def test_scalar_drops_axis():
+    assert np.allclose(cube().sel("W", RNG=50), [250, 350, 450])
+    assert cube().sel("W", RNWY=300, RNG=100) == 400
+
+def test_sequence_keeps_given_order():
+    W = cube().sel("W", RNWY=[300, 200], RNG=[100, 50])
+    assert np.allclose(W, [[400, 350], [300, 250]])
+
+def test_missing_values_are_nan():
+    W = cube().sel("W", RNWY=[200, 250], RNG=50)
+    assert W[0] == 250
+    assert np.isnan(W[1])
+
+def test_later_rows_win():
+    data = {"RNWY": np.array([200., 200.]), "RNG": np.array([50., 50.]),
+            "W": np.array([1., 2.])}
+    assert ResultCube(data, axes=("RNWY", "RNG")).sel("W", RNWY=200,
+                                                      RNG=50) == 2
+
+def test_rows_without_a_swept_coordinate_are_dropped():
+    data = {"RNWY": np.array([200., np.nan, 300.]),
+            "RNG": np.array([50., 50., 50.]), "W": np.array([1., 2., 3.])}
+    c = ResultCube(data, axes=("RNWY", "RNG"))
+    assert np.allclose(c.values[0], [200, 300])
+    assert np.isnan(c["W"][-1]).all()
+    assert np.allclose(c.sel("W", RNG=50), [1, 3])
+
+def test_axis_that_was_not_swept():
+    data = {"RNWY": np.array([200., 300.]), "GLND": np.full(2, np.nan),
+            "W": np.array([1., 2.])}
+    c = ResultCube(data, axes=("RNWY", "GLND"))
+    assert c.shape == (3, 1)
+    assert np.allclose(c.sel("W"), [1, 2])
+    assert np.allclose(c.sel("W", GLND=0.5), [1, 2])
@@ -0,0 +1,78 @@
+" Extrapolator predictions, curvature bound and storage "
+import numpy as np
+from extrapolate import Extrapolator
+
+def power_law(point):
+    " record of f = 2*RNG**0.7*PAY**-0.3 with output W = 5*RNG**1.5 "
+    return {"key": None, "point": point, "status": "ok",
+            "cost": 2*point["RNG"]**0.7*point["PAY"]**-0.3,
+            "sensitivities": {"RNG": 0.7, "PAY": -0.3},
+            "result": {"W": 5*point["RNG"]**1.5}}
+
+def curved(point, k):
+    " record of log f = k*log(RNG)**2, whose log-curvature is 2k "
+    u = np.log(point["RNG"])
+    return {"key": None, "point": point, "status": "ok",
+            "cost": np.exp(k*u**2), "sensitivities": {"RNG": 2*k*u}}
+
+def test_power_law_is_exact():
+    ex = Extrapolator(tol=1e-6, outputs=("W",), verify=0.)
+    rng = np.random.RandomState(0)
+    for r, p in zip(rng.uniform(100, 200, 30), rng.uniform(500, 1100, 30)):
+        ex.record(power_law({"RNG": r, "PAY": p}))
+    assert ex.checks == 29
+    point = {"RNG": 150., "PAY": 950.}
+    record = ex.extrapolated(("x", point))
+    assert record is not None and record["extrapolated"]
+    assert record["error_estimate"] < 1e-12
+    expected = power_law(point)
+    assert np.isclose(record["cost"], expected["cost"], rtol=1e-9)
+    assert np.isclose(record["result"]["W"], expected["result"]["W"],
+                      rtol=1e-9)
+    assert ex.skipped == 1
+
+def test_high_curvature_is_solved():
+    k = 5.
+    ex = Extrapolator(tol=0.01, verify=0.)
+    for r in np.exp(np.arange(4.5, 5.21, 0.1)):
+        ex.record(curved({"RNG": r}, k))
+    assert np.allclose(ex.curvature[("cost", "RNG")], k)
+    # k*dlogp**2: 5*0.05**2 > tol, 5*0.01**2 < tol
+    far = {"RNG": np.exp(5.25)}
+    near = {"RNG": np.exp(5.21)}
+    assert ex.error(np.log([far["RNG"]]) - ex.X[ex.n - 1]) > ex.tol
+    assert ex.extrapolated(("far", far)) is None
+    record = ex.extrapolated(("near", near))
+    assert record is not None
+    assert abs(np.log(record["cost"]/curved(near, k)["cost"])) < ex.tol
+
+def test_nothing_extrapolated_before_min_checks():
+    ex = Extrapolator(tol=1., verify=0., min_checks=5)
+    for r in (100., 110., 120.):
+        ex.record(power_law({"RNG": r, "PAY": 500.}))
+    assert ex.extrapolated(("x", {"RNG": 115., "PAY": 500.})) is None
+
+def test_infeasible_neighbour_blocks_extrapolation():
+    ex = Extrapolator(tol=1., verify=0., min_checks=1)
+    for r in (100., 110., 120.):
+        ex.record(power_law({"RNG": r, "PAY": 500.}))
+    point = {"RNG": 125., "PAY": 500.}
+    assert ex.extrapolated(("x", point)) is not None
+    ex.record({"key": None, "point": {"RNG": 128., "PAY": 500.},
+               "status": "infeasible"})
+    assert ex.extrapolated(("x", point)) is None
+
+def test_storage_grows_past_initial_capacity():
+    ex = Extrapolator(verify=0.)
+    points = [{"RNG": 100. + i, "PAY": 500. + 10*(i % 3)} for i in range(40)]
+    for point in points:
+        ex.record(power_law(point))
+    assert ex.n == 40 and len(ex.X) >= 40 and len(ex.sens) >= 40
+    assert np.allclose(ex.X[:ex.n, ex.axes.index("RNG")],
+                       np.log([p["RNG"] for p in points]))
+    assert np.allclose(np.exp(ex.logcost[:ex.n]),
+                       [power_law(p)["cost"] for p in points])
+    for i in (0, 15, 16, 39):
+        cost, _, dx = ex.predict(points[i])
+        assert not dx.any()
+        assert np.isclose(cost, power_law(points[i])["cost"])
@@ -0,0 +1,43 @@
+" closed-form ground roll against numerical integration "
+import numpy as np
+import pytest
+import groundroll
+
+def integrated(A, B, V, n=200001):
+    " distance to go between 0 and V with acceleration A - B*v**2 "
+    v = np.linspace(0, V, n)
+    f = v/np.abs(A - B*v**2)
+    return np.sum((f[1:] + f[:-1])/2*np.diff(v))
+
+@pytest.mark.parametrize("A, B, V", [
+    (3., 1e-4, 40.),     # takeoff, drag grows with speed
+    (3., -2e-4, 40.),    # takeoff, lift relief outweighs drag
+    (-5., 2e-4, 35.),    # landing, drag helps braking
+    (-5., -1e-4, 35.),   # landing, lift unloads the brakes
+])
+def test_matches_integration(A, B, V):
+    assert np.isclose(groundroll.ground_roll(A, B, V), integrated(A, B, V),
+                      rtol=1e-6)
+
+def test_zero_drag_limit():
+    assert np.isclose(groundroll.ground_roll(3., 0., 40.), 40.**2/2/3.)
+    assert np.isclose(groundroll.ground_roll(3., 1e-14, 40.), 40.**2/2/3.)
+
+def test_unreachable_speed_is_inf():
+    assert np.isinf(groundroll.ground_roll(1., 1e-3, 40.))
+
+def test_broadcasts():
+    S = groundroll.ground_roll(3., 1e-4, np.array([[10.], [20.]])*np.ones(3))
+    assert S.shape == (2, 3)
+    assert (S[1] > S[0]).all()
+
+def test_landing_array_matches_scalar():
+    arrays = groundroll.gr_landing_array(0., 0.5, [10., 15.], 4.0, 8.)
+    single = groundroll.gr_landing(0., 0.5, 15., 4.0, 8.)
+    assert np.isclose(arrays["S"][1], single["S"])
+    assert arrays["S"][0] < arrays["S"][1]
+
+def test_takeoff_needs_thrust_above_friction():
+    out = groundroll.gr_takeoff_array([0.01, 0.6], 0.04, 15., 4.0, 8.)
+    assert np.isinf(out["S"][0])
+    assert np.isfinite(out["S"][1])
@@ -0,0 +1,70 @@
+" InfeasibleScreen dominance, verification and ordering "
+import itertools
+import pytest
+from prescreen import InfeasibleScreen, HARDER
+
+BASE = {"RNWY": 300., "RNG": 100., "PAY": 975., "VCR": 150., "GLND": 0.5}
+
+def shifted(axis, step):
+    " BASE with axis moved by step, scaled to the axis "
+    return dict(BASE, **{axis: BASE[axis]*(1 + step)})
+
+@pytest.mark.parametrize("axis", sorted(HARDER))
+def test_dominance_follows_harder(axis):
+    screen = InfeasibleScreen()
+    screen.record(BASE, "infeasible")
+    harder = shifted(axis, 0.1*HARDER[axis])
+    easier = shifted(axis, -0.1*HARDER[axis])
+    assert screen.screen(BASE) == "skip"
+    assert screen.screen(harder) == "skip"
+    assert screen.screen(easier) == "solve"
+    assert screen.skipped == 2
+
+def test_axes_outside_harder_must_match():
+    screen = InfeasibleScreen()
+    screen.record(dict(BASE, mode=1), "infeasible")
+    assert screen.predict(dict(BASE, mode=1))
+    assert not screen.predict(dict(BASE, mode=2))
+    assert not screen.predict(BASE)
+
+def test_nothing_screened_before_an_infeasible_point():
+    screen = InfeasibleScreen(verify=0.5)
+    points = [shifted(a, s) for a in sorted(HARDER) for s in (-0.1, 0.1)]
+    screen.record(BASE, "ok")
+    screen.record(BASE, "failed")
+    assert [screen.screen(p) for p in points] == ["solve"]*len(points)
+    assert screen.skipped == 0 and screen.corners == []
+
+def test_verify_fraction():
+    screen = InfeasibleScreen(verify=0.2, seed=1)
+    screen.record(BASE, "infeasible")
+    n = 2000
+    outcomes = [screen.screen(BASE) for _ in range(n)]
+    assert set(outcomes) == set(["skip", "verify"])
+    assert abs(outcomes.count("verify")/float(n) - 0.2) < 0.03
+    assert screen.skipped == outcomes.count("skip")
+    assert [InfeasibleScreen().screen(BASE)] == ["solve"]
+
+def test_feasible_verification_refutes_corner():
+    screen = InfeasibleScreen(verify=1.)
+    screen.record(BASE, "infeasible")
+    harder = shifted("RNG", 0.1)
+    assert screen.screen(harder) == "verify"
+    screen.record(harder, "ok")
+    assert screen.refuted == 1 and screen.corners == []
+    assert screen.screen(BASE) == "solve"
+
+def test_corners_stay_minimal():
+    screen = InfeasibleScreen()
+    screen.record(shifted("RNG", 0.2), "infeasible")
+    screen.record(BASE, "infeasible")
+    assert screen.corners == [BASE]
+
+def test_order_easiest_first():
+    screen = InfeasibleScreen()
+    tasks = [((r, w), {"RNG": r, "RNWY": w, "mode": 1})
+             for r, w in itertools.product((200., 100.), (100., 300.))]
+    order = [k for k, _ in screen.order(tasks)]
+    assert order[0] == (100., 300.)
+    assert order[-1] == (200., 100.)
+    assert sorted(order[1:3]) == [(100., 100.), (200., 300.)]
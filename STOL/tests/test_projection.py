@@ -0,0 +1,54 @@
+" Projection of solutions to float64 rows "
+import numpy as np
+from projection import Projection
+
+class Solution(dict):
+    " stand-in for a SolutionArray: sol(name) and sol[...] lookups "
+    def __call__(self, name):
+        return self["variables"][name]
+
+def solution(W, Wbatt, fref):
+    " solution with two variables and one sensitivity "
+    return Solution(cost=W, variables={"W": W, "Wbatt": Wbatt},
+                    sensitivities={"constants": {"fref": fref}})
+
+PROJECT = Projection(["W", "Wbatt"], ["fref"])
+
+def test_columns():
+    assert PROJECT.columns == ["cost", "W", "Wbatt", "sens(fref)"]
+
+def test_row_and_handler():
+    sol = solution(3000., 900., 0.4)
+    assert PROJECT.row(sol).dtype == np.float64
+    assert np.allclose(PROJECT.row(sol), [3000, 3000, 900, 0.4])
+    assert PROJECT(sol, "key") == {"cost": 3000., "W": 3000.,
+                                   "Wbatt": 900., "sens(fref)": 0.4}
+
+def test_rows_and_column():
+    table = PROJECT.rows([solution(3000., 900., 0.4), None,
+                          solution(3500., 1200., 0.)])
+    assert table.shape == (3, 4)
+    assert np.isnan(table[1]).all()
+    assert np.allclose(PROJECT.column(table, "Wbatt")[[0, 2]], [900, 1200])
+    assert np.allclose(PROJECT.column(table, "fref")[[0, 2]], [0.4, 0.])
+    assert np.allclose(PROJECT.column(table, "cost")[[0, 2]], [3000, 3500])
+
+class Tree(object):
+    " stand-in for an autosweep_1d tree over R with W = 10*R "
+    sweptvar = "R"
+
+    def __init__(self):
+        self.solarray = Solution(variables={"R": np.array([30., 10., 20.])},
+                                 sensitivities={"constants": {
+                                     "fref": np.array([0.3, 0.1, 0.2])}})
+
+    @staticmethod
+    def sample_at(x):
+        " oracle at x "
+        return Solution(cost=10*x, variables={"W": 10*x, "Wbatt": 2*x})
+
+def test_sample():
+    x = np.array([10., 15., 25.])
+    table = PROJECT.sample(Tree(), x)
+    assert np.allclose(PROJECT.column(table, "W"), 10*x)
+    assert np.allclose(PROJECT.column(table, "fref"), [0.1, 0.15, 0.25])
@@ -0,0 +1,87 @@
+" ResultStore journal recovery "
+import os
+import numpy as np
+from store import ResultStore, record_row
+
+def rows(*keys, **kwargs):
+    " ok rows with the given keys "
+    status = kwargs.get("status", "ok")
+    return [{"key": k, "status": status, "x": float(i)}
+            for i, k in enumerate(keys)]
+
+def test_flush_and_load(tmpdir):
+    store = ResultStore(str(tmpdir), chunk_rows=2)
+    for row in rows("a", "b", "c"):
+        store.append(row)
+    store.flush()
+    data = ResultStore(str(tmpdir)).load()
+    assert list(data["key"]) == ["a", "b", "c"]
+    assert np.allclose(data["x"], [0, 1, 2])
+    assert ResultStore(str(tmpdir)).chunks() == ["chunk_00000.npz",
+                                                 "chunk_00001.npz"]
+
+def test_journal_survives_crash(tmpdir):
+    store = ResultStore(str(tmpdir), chunk_rows=10)
+    for row in rows("a", "b"):
+        store.append(row)
+    # crash without flush, mid-way through writing a third row
+    store.journal.write('{"key": "c", "sta')
+    store.journal.close()
+    resumed = ResultStore(str(tmpdir))
+    assert resumed.done() == set(["a", "b"])
+    assert resumed.pending([("a", {}), ("c", {})]) == [("c", {})]
+    resumed.flush()
+    assert list(ResultStore(str(tmpdir)).load()["key"]) == ["a", "b"]
+
+def test_journaled_rows_in_a_chunk_are_not_duplicated(tmpdir):
+    store = ResultStore(str(tmpdir), chunk_rows=10)
+    for row in rows("a", "b"):
+        store.append(row)
+    journal = open(store.journal_path).read()
+    store.flush()
+    # crash between writing the chunk and truncating the journal
+    with open(store.journal_path, "w") as fid:
+        fid.write(journal)
+    resumed = ResultStore(str(tmpdir))
+    resumed.append(rows("c")[0])
+    resumed.flush()
+    assert sorted(ResultStore(str(tmpdir)).load()["key"]) == ["a", "b", "c"]
+
+def test_partial_chunk_is_ignored(tmpdir):
+    store = ResultStore(str(tmpdir), chunk_rows=1)
+    store.append(rows("a")[0])
+    for name in ("tmp_chunk_00001.npz", "chunk_00001.tmp.npz"):
+        with open(os.path.join(str(tmpdir), name), "w") as fid:
+            fid.write("partial")
+    resumed = ResultStore(str(tmpdir), chunk_rows=1)
+    assert resumed.done() == set(["a"])
+    resumed.append(rows("b")[0])
+    assert resumed.chunks() == ["chunk_00000.npz", "chunk_00001.npz"]
+    assert sorted(resumed.load()["key"]) == ["a", "b"]
+
+def test_failed_rows_are_pending(tmpdir):
+    store = ResultStore(str(tmpdir), chunk_rows=1)
+    store.append(rows("a", status="failed")[0])
+    store.append(rows("b", status="infeasible")[0])
+    store.append(rows("c", status="failed")[0])
+    resumed = ResultStore(str(tmpdir), chunk_rows=10)
+    assert resumed.done() == set(["b"])
+
+def test_screened_rows_are_pending(tmpdir):
+    store = ResultStore(str(tmpdir), chunk_rows=2)
+    records = [{"key": "a", "point": {"RNG": 100.}, "status": "infeasible",
+                "screened": True, "error": "predicted infeasible by prescreen"},
+               {"key": "b", "point": {"RNG": 200.}, "status": "infeasible"},
+               {"key": "c", "point": {"RNG": 300.}, "status": "infeasible",
+                "screened": True}]
+    for record in records:
+        store.append(record_row(record))
+    # a, b are in a chunk and c only in the journal when the sweep stops
+    resumed = ResultStore(str(tmpdir))
+    assert resumed.done() == set(["b"])
+    tasks = [(r["key"], r["point"]) for r in records]
+    assert resumed.pending(tasks) == [tasks[0], tasks[2]]
+    resumed.flush()
+    data = ResultStore(str(tmpdir)).load()
+    assert list(data["screened"][data["key"] == "a"]) == [1.]
+    assert np.isnan(data["screened"][data["key"] == "b"]).all()
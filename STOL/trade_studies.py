@@ -1,8 +1,12 @@
 import numpy as np
-from scipy.interpolate import interp1d
 from plotting import labelLines
-from stol import Mission, baseline, advanced
+from stol import Mission, baseline, advanced, vectorized_mission
+from template import axis_var
 from gpkit.tools import autosweep_1d
+from cache import SolveCache
+from warmstart import Continuation
+from solvers import get_solver
+from projection import Projection
 import matplotlib.pyplot as plt
 plt.rcParams.update({'font.size':19})
 
@@ -10,7 +14,8 @@ clrs = ["#084081", "#0868ac", "#2b8cbe", "#4eb3d3", "#7bccc4"]*5
 clrs2 = ["#4F090C", "#9D1317", "#EC1C23", "#F2686C", "#F9B3B6"]*5
 
 def plot_trade(model, minx, xvar, xex, yvar, ymax, zvar, zrange, xlabel,
-               ylabel, xllabel, fsl=12, svar=None, senslabel=None):
+               ylabel, xllabel, fsl=12, svar=None, senslabel=None,
+               cache=None):
 
     del model.substitutions[xvar]
     fig, ax = plt.subplots()
@@ -20,25 +25,46 @@ def plot_trade(model, minx, xvar, xex, yvar, ymax, zvar, zrange, xlabel,
     i = 0
     Nsweep = 100
     xplot = 0
+    # only y and the sensitivities are kept of each solution
+    project = Projection([yvar], svar or [])
+    sp = getattr(model, "sp", False)
+    if sp:
+        # signomial models are swept by continuation, see warmstart
+        cont = Continuation(model)
+        Nsweep = 25
 
     for z in zrange:
-        model.substitutions.update({zvar: z})
         model.cost = xvar if minx else 1/xvar
-        sol = model.solve("mosek", verbosity=0)
+        if sp:
+            sol = cont.solve({zvar: z})
+        else:
+            model.substitutions.update({zvar: z})
+            if cache:
+                sol = cache.solve(model, get_solver(), verbosity=0)
+            else:
+                sol = model.solve(get_solver(), verbosity=0)
         model.cost = yvar
         xmin = sol(xvar).magnitude*1.01 if minx else xex
         xmax = xex if minx else sol(xvar).magnitude*0.99
         xplot = xmax if xmax > xplot else xplot
-        bst = autosweep_1d(model, 0.1, model[xvar], [xmin, xmax], verbosity=0)
         _x = np.linspace(xmin, xmax, Nsweep)
-        if svar:
-            for sv, cls in zip(svar, [clrs, clrs2]):
-                sensland = bst.solarray["sensitivities"]["constants"][sv]
-                xp = bst.solarray(xvar).magnitude
-                f = interp1d(xp, sensland)
-                sensland = f(_x)
-                axs.plot(_x, np.abs(sensland), c=cls[i])
-        y = bst.sample_at(_x)(yvar)
+        if sp:
+            rows = cont.sweep(model[xvar], _x, project)
+            del model.substitutions[xvar]
+            ok = np.isfinite(rows[:, 0])
+            _x, rows = _x[ok], rows[ok]
+        elif cache:
+            rows = cache.autosweep(model, 0.1, model[xvar], [xmin, xmax],
+                                   project=project, x=_x, verbosity=0)
+        else:
+            rows = project.sample(autosweep_1d(model, 0.1, model[xvar],
+                                               [xmin, xmax],
+                                               solver=get_solver(),
+                                               verbosity=0), _x)
+        y = project.column(rows, yvar)
+        senss = [project.column(rows, sv) for sv in svar or []]
+        for sensland, cls in zip(senss, [clrs, clrs2]):
+            axs.plot(_x, np.abs(sensland), c=cls[i])
         lstr = "%d" if isinstance(z, int) else "%.1f"
         ax.plot(_x, y, c=clrs[i], lw=2, label=lstr % z)
         i += 1
@@ -59,8 +85,71 @@ def plot_trade(model, minx, xvar, xex, yvar, ymax, zvar, zrange, xlabel,
 
     return fig, ax
 
+def plot_trade_vec(subs, minx, xvar, xex, yvar, ymax, zvar, zrange, xlabel,
+                   ylabel, xllabel, fsl=12, svar=None, senslabel=None,
+                   Nsweep=25):
+    """ plot_trade with every z-value of the family solved in one GP
+
+    Variables are attribute paths or names (see template.axis_var) since the
+    Missions are rebuilt vectorized, and subs (e.g. baseline) is applied to
+    each.  One GP over len(zrange) Missions finds the x limits, a second over
+    len(zrange)*Nsweep Missions evaluates every curve.
+    """
+    nz = len(zrange)
+    M = vectorized_mission(nz)
+    subs(M)
+    X, Z = axis_var(M, xvar), axis_var(M, zvar)
+    del M.substitutions[X]
+    M.substitutions.update({Z: np.array(zrange, dtype=float)})
+    M.cost = X.sum() if minx else (1/X).sum()
+    xlim = M.solve(get_solver(), verbosity=0)(X).magnitude
+    xmin = xlim*1.01 if minx else np.full(nz, xex)
+    xmax = np.full(nz, xex) if minx else xlim*0.99
+    _x = np.array([np.linspace(a, b, Nsweep) for a, b in zip(xmin, xmax)])
+
+    M = vectorized_mission(nz*Nsweep)
+    subs(M)
+    X, Y, Z = axis_var(M, xvar), axis_var(M, yvar), axis_var(M, zvar)
+    M.substitutions.update({X: _x.ravel(),
+                            Z: np.repeat(np.array(zrange, dtype=float),
+                                         Nsweep)})
+    M.cost = Y.sum()
+    sol = M.solve(get_solver(), verbosity=0)
+    y = sol(Y).magnitude.reshape(nz, Nsweep)
+
+    fig, ax = plt.subplots()
+    if svar:
+        fis, axs = plt.subplots()
+        fig = [fig, fis]
+    # the GP minimizes sum(Y), so the sensitivity of element k is that of
+    # its own Y_k scaled by Y_k/sum(Y); undo the scaling per curve
+    senss = [np.reshape(sol["sensitivities"]["constants"][axis_var(M, sv)],
+                        (nz, Nsweep))*y.sum()/y for sv in svar or []]
+    for i, z in enumerate(zrange):
+        for sens, cls in zip(senss, [clrs, clrs2]):
+            axs.plot(_x[i], np.abs(sens[i]), c=cls[i])
+        lstr = "%d" if isinstance(z, int) else "%.1f"
+        ax.plot(_x[i], y[i], c=clrs[i], lw=2, label=lstr % z)
+
+    ax.grid()
+    ax.set_ylim([0, ymax])
+    ax.set_xlim([0, _x.max()])
+    labelLines(ax.lines, align=False, xvals=xllabel, fontsize=fsl)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+    if svar:
+        axs.set_ylabel(senslabel)
+        axs.grid()
+        axs.set_xlim([0, xmax[-1]])
+        axs.set_xlabel(xlabel)
+        ax = [ax, axs]
+
+    return fig, ax
+
 if __name__ == "__main__":
     path = "../docs/"
+    cache = SolveCache()
     M = Mission(sp=False)
     baseline(M)
     fig, ax = plot_trade(M, minx=True, xvar=M.Srunway, xex=800,
@@ -69,7 +158,7 @@ if __name__ == "__main__":
                         xlabel="Runway Length [ft]",
                         ylabel="Max Takeoff Weight [lbf]", xllabel=[450]*7,
                         fsl=14, svar=[M.landing.CLland, M.takeoff.CLto],
-                        senslabel="Sensitivity to Constraints")
+                        senslabel="Sensitivity to Constraints", cache=cache)
     ax[1].set_ylim([-2, 10])
     ax[1].text(125, -0.75, "Takeoff", ha="center")
     ax[1].text(210, 8, "Landing")
@@ -82,7 +171,7 @@ if __name__ == "__main__":
                         xlabel="Runway Length [ft]",
                         ylabel="Max Takeoff Weight [lbf]", xllabel=[450]*7,
                         fsl=14, svar=[M.landing.CLland, M.takeoff.CLto],
-                        senslabel="Sensitivity to Constraints")
+                        senslabel="Sensitivity to Constraints", cache=cache)
     ax[1].set_ylim([-2, 10])
     ax[1].text(25, -0.75, "Takeoff")
     ax[1].text(65, 8, "Landing")
@@ -95,7 +184,7 @@ if __name__ == "__main__":
                          xlabel="Minimum Cruise Speed ($V_{\mathrm{min}}$) [kts]",
                          ylabel="Max Takeoff Weight [lbf]",
                          xllabel=[130, 120, 110],
-                         fsl=14)
+                         fsl=14, cache=cache)
     ax.set_xlim([20, 160])
     ax.fill_between([20, 90], 0, 8000, facecolor="None", edgecolor="k",
                     hatch="/", lw=1)
@@ -109,41 +198,34 @@ if __name__ == "__main__":
                          xlabel="Minimum Cruise Speed ($V_{\mathrm{min}}$) [kts]",
                          ylabel="Max Takeoff Weight [lbf]",
                          xllabel=[81, 117, 138],
-                         fsl=14)
+                         fsl=14, cache=cache)
     ax.set_xlim([20, 180])
     ax.fill_between([20, 60], 0, 8000, facecolor="None", edgecolor="k",
                     hatch="/", lw=1)
     ax.text(40, 1300, "$V_{\mathrm{cruise}} \geq V_{\mathrm{min}}$\n inactive", ha="center")
     ax.text(80, 1300, "$V_{\mathrm{cruise}} \geq V_{\mathrm{min}}$\n active", ha="center")
     fig.savefig(path + "vweightS.pdf", bbox_inches="tight")
-    baseline(M)
-    fig, _ = plot_trade(M, minx=True, xvar=M.Srunway, xex=800,
-                        yvar=M.aircraft.W,
-                        ymax=8000, zvar=M.landing.CLland,
-                        zrange=[3.5, 4.0, 4.5],
-                        xlabel="Runway Length [ft]",
-                        ylabel="Max Takeoff Weight [lbf]",
-                        xllabel=[245, 225, 212],
-                        fsl=14)
+    fig, _ = plot_trade_vec(baseline, minx=True, xvar="Srunway", xex=800,
+                            yvar="W", ymax=8000, zvar="landing.CLland",
+                            zrange=[3.5, 4.0, 4.5],
+                            xlabel="Runway Length [ft]",
+                            ylabel="Max Takeoff Weight [lbf]",
+                            xllabel=[245, 225, 212],
+                            fsl=14)
     fig.savefig(path + "smtow_clmax.pdf", bbox_inches="tight")
-    baseline(M)
-    fig, _ = plot_trade(M, minx=True, xvar=M.Srunway, xex=800,
-                        yvar=M.aircraft.W,
-                        ymax=8000, zvar=M.landing.gload,
-                        zrange=[0.4, 0.6, 0.7],
-                        xlabel="Runway Length [ft]",
-                        ylabel="Max Takeoff Weight [lbf]",
-                        xllabel=[235, 180, 200],
-                        fsl=14)
+    fig, _ = plot_trade_vec(baseline, minx=True, xvar="Srunway", xex=800,
+                            yvar="W", ymax=8000, zvar="landing.gload",
+                            zrange=[0.4, 0.6, 0.7],
+                            xlabel="Runway Length [ft]",
+                            ylabel="Max Takeoff Weight [lbf]",
+                            xllabel=[235, 180, 200],
+                            fsl=14)
     fig.savefig(path + "smtow_gl.pdf", bbox_inches="tight")
-    baseline(M)
-    fig, _ = plot_trade(M, minx=True, xvar=M.Srunway, xex=800,
-                        yvar=M.aircraft.W,
-                        ymax=8000, zvar=M.aircraft.hbatt,
-                        zrange=[210, 250, 300],
-                        xlabel="Runway Length [ft]",
-                        ylabel="Max Takeoff Weight [lbf]",
-                        xllabel=[225, 210, 210],
-                        fsl=14)
+    fig, _ = plot_trade_vec(baseline, minx=True, xvar="Srunway", xex=800,
+                            yvar="W", ymax=8000, zvar="aircraft.hbatt",
+                            zrange=[210, 250, 300],
+                            xlabel="Runway Length [ft]",
+                            ylabel="Max Takeoff Weight [lbf]",
+                            xllabel=[225, 210, 210],
+                            fsl=14)
     fig.savefig(path + "smtow_hbatt.pdf", bbox_inches="tight")
-
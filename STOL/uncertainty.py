@@ -0,0 +1,152 @@
+" Monte Carlo propagation of technology uncertainty through the Mission "
+import numpy as np
+from stol import Mission, baseline
+from template import MissionTemplate, axis_var, axis_value
+from sweep import run_sweep
+from store import SUMMARY
+from solvers import get_solver
+
+# pylint: disable=invalid-name
+
+# ("uniform", low, high) spanning stol.baseline to stol.advanced, or
+# ("triangular", low, mode, high) / ("normal", mean, std) / ("lognormal",
+# median, sigma of the log)
+DISTRIBUTIONS = {
+    "aircraft.hbatt": ("uniform", 210., 300.),
+    "aircraft.sp_motor": ("uniform", 7./9.81, 7./9.81*1.2),
+    "takeoff.CLto": ("uniform", 4., 5.),
+    "landing.CLland": ("uniform", 3.5, 4.5),
+    "GLND": ("uniform", 0.4, 0.7),
+    "aircraft.fstruct": ("triangular", 0.17, 0.2, 0.23),
+}
+
+def sample(n, distributions=None, seed=0):
+    " dict of name: n samples of each distribution "
+    rng = np.random.RandomState(seed)
+    out = {}
+    for name, dist in sorted((distributions or DISTRIBUTIONS).items()):
+        kind, args = dist[0], dist[1:]
+        if kind == "lognormal":
+            out[name] = args[0]*np.exp(args[1]*rng.standard_normal(n))
+        else:
+            out[name] = getattr(rng, kind)(*(args + (n,)))
+    return out
+
+def nominal(distributions=None):
+    " dict of name: mean of each distribution "
+    out = {}
+    for name, dist in (distributions or DISTRIBUTIONS).items():
+        kind, args = dist[0], dist[1:]
+        if kind == "lognormal":
+            out[name] = args[0]*np.exp(0.5*args[1]**2)
+        else:
+            out[name] = float(np.mean(args)) if kind != "normal" else args[0]
+    return out
+
+def summary_handler(sol, key):
+    " sweep handler returning the SUMMARY columns of a solution "
+    out = {}
+    for col, name in SUMMARY.items():
+        try:
+            out[col] = float(getattr(sol["variables"][name], "magnitude",
+                                     sol["variables"][name]))
+        except KeyError:
+            pass
+    return out
+
+def monte_carlo(n, point=None, runway=None, distributions=None, seed=0,
+                processes=None, **template_kw):
+    """ solve n sampled Missions across a process pool
+
+    point fixes other axes (e.g. {"RNG": 100, "PAY": 975}) and runway the
+    runway length; template_kw (objective, costModel, subs, ...) configure
+    the MissionTemplate, so each worker compiles the GP once and every
+    sample only rescales its coefficients.  subs defaults to
+    stol.baseline, which also gives the runway a value.
+
+    Returns a dict of the samples, the objective "cost" and SUMMARY
+    columns (NaN where infeasible), "feasible" and "p_feasible".
+    """
+    template_kw.setdefault("subs", baseline)
+    samples = sample(n, distributions, seed)
+    fixed = dict(point or {})
+    if runway is not None:
+        fixed["RNWY"] = runway
+    names = sorted(samples)
+    tasks = [(i, dict(fixed, **dict((a, samples[a][i]) for a in names)))
+             for i in range(n)]
+    out = dict(samples)
+    out["cost"] = np.full(n, np.nan)
+    out["feasible"] = np.zeros(n, dtype=bool)
+    for col in SUMMARY:
+        out[col] = np.full(n, np.nan)
+    for record in run_sweep(tasks, processes, summary_handler,
+                            axes=sorted(fixed) + names, **template_kw):
+        i = record["key"]
+        if record["status"] == "ok":
+            out["feasible"][i] = True
+            out["cost"][i] = record["cost"]
+            for col, v in (record["result"] or {}).items():
+                out[col][i] = v
+    out["p_feasible"] = out["feasible"].mean()
+    return out
+
+def min_runway(point, params, subs=baseline, costModel=False, solver=None):
+    """ shortest feasible runway at point and params and its
+    log-sensitivities to each of params """
+    M = Mission(costModel=costModel)
+    if subs:
+        subs(M)
+    for name, value in dict(point, **params).items():
+        M.substitutions[axis_var(M, name)] = axis_value(M, name, value)
+    if M.Srunway in M.substitutions:
+        del M.substitutions[M.Srunway]
+    M.cost = M.Srunway
+    sol = M.solve(solver or get_solver(), verbosity=0)
+    senss = sol["sensitivities"]["constants"]
+    return float(sol["cost"]), dict((a, float(senss[axis_var(M, a)]))
+                                    for a in params)
+
+def linearized(n, point=None, runway=None, distributions=None, seed=0,
+               **template_kw):
+    """ monte_carlo from first-order log-space expansions about the mean
+
+    One solve at the mean parameters gives the objective and its
+    log-sensitivities, cost ~ cost0*prod((p/p0)**s); with a runway, a
+    second solve minimizing the runway gives the shortest runway the same
+    way and a sample is feasible if that is below runway.  Accurate while
+    the samples stay in one active-set region; check against monte_carlo.
+    subs defaults to stol.baseline as in monte_carlo.
+    """
+    template_kw.setdefault("subs", baseline)
+    samples = sample(n, distributions, seed)
+    p0 = nominal(distributions)
+    fixed = dict(point or {})
+    if runway is not None:
+        fixed["RNWY"] = runway
+    names = sorted(samples)
+    template = MissionTemplate(axes=sorted(fixed) + names, **template_kw)
+    sol = template.solve(dict(fixed, **p0))
+    s = template.sensitivities(sol)
+    logp = dict((a, np.log(samples[a]/p0[a])) for a in names)
+    out = dict(samples)
+    out["cost"] = float(sol["cost"])*np.exp(sum(s[a]*logp[a] for a in names))
+    out["feasible"] = np.ones(n, dtype=bool)
+    if runway is not None:
+        rest = dict((k, v) for k, v in fixed.items() if k != "RNWY")
+        S0, sS = min_runway(rest, p0, template_kw.get("subs"),
+                            template_kw.get("costModel", False),
+                            template.solver)
+        out["min_runway"] = S0*np.exp(sum(sS[a]*logp[a] for a in names))
+        out["feasible"] = out["min_runway"] <= runway
+    out["p_feasible"] = out["feasible"].mean()
+    return out
+
+if __name__ == "__main__":
+    POINT = {"RNG": 100, "PAY": 975}
+    for MODE in (linearized, monte_carlo):
+        OUT = MODE(1000, POINT, runway=300)
+        W = OUT["cost"][OUT["feasible"]]
+        print "%-12s P(feasible) %.3f  MTOW mean %.0f  5-95%% %.0f-%.0f lbf" % (
+            MODE.__name__, OUT["p_feasible"], W.mean(),
+            np.percentile(W, 5), np.percentile(W, 95))
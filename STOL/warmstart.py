@@ -0,0 +1,154 @@
+" signomial Missions started from the solution of their GP relaxation "
+import numpy as np
+from stol import Mission
+from solvers import get_solver
+
+# pylint: disable=invalid-name
+
+def variable_id(vk):
+    " identity of a variable that is shared between Mission instances "
+    lineage = getattr(vk, "lineage", None)
+    if lineage is not None:
+        models = tuple(m[0] if isinstance(m, tuple) else m for m in lineage)
+    else:
+        models = tuple(getattr(vk, "models", ()))
+    return (vk.name, models, getattr(vk, "idx", None))
+
+def counterparts(source, target):
+    " dict of source VarKey: target VarKey for variables both models share "
+    ids = dict((variable_id(vk), vk) for vk in target.varkeys)
+    return dict((vk, ids[variable_id(vk)]) for vk in source.varkeys
+                if variable_id(vk) in ids)
+
+def gp_relaxation(model):
+    """ Mission(sp=False) with the substitutions and objective of model
+
+    GLanding and the GP takeoff drag replace the signomial landing and
+    takeoff; constants of the shared submodels are copied over.
+    """
+    gp = Mission(sp=False, costModel=model.costModel)
+    pairs = counterparts(model, gp)
+    for vk, v in model.substitutions.items():
+        if vk in pairs:
+            gp.substitutions[pairs[vk]] = v
+    gp.cost = model.cost.sub(dict((vk, gp[pairs[vk]])
+                                  for vk in model.cost.varkeys))
+    return gp
+
+def warm_localsolve(model, solver=None, compare=False, verbosity=0,
+                    **kwargs):
+    """ localsolve model (a Mission(sp=True)) starting from its GP relaxation
+
+    Returns the solution and a dict with the number of GP solves of the
+    warm start ("warm", including the relaxation) and, if compare, of a
+    cold localsolve ("cold") and the difference ("saved").
+    """
+    solver = solver or get_solver()
+    info = {}
+    if compare:
+        model.localsolve(solver, verbosity=verbosity, **kwargs)
+        info["cold"] = len(model.program.gps)
+
+    gp = gp_relaxation(model)
+    gpsol = gp.solve(solver, verbosity=verbosity)
+    pairs = counterparts(gp, model)
+    x0 = {}
+    for vk, v in gpsol["freevariables"].items():
+        if vk in pairs:
+            x0[pairs[vk]] = getattr(v, "magnitude", v)
+
+    sol = model.localsolve(solver, verbosity=verbosity, x0=x0, **kwargs)
+    info["warm"] = len(model.program.gps) + 1
+    if compare:
+        info["saved"] = info["cold"] - info["warm"]
+    return sol, info
+
+class Continuation(object):
+    """ localsolves of an SP Mission along a path of substitutions
+
+    The first solve is warm-started from the GP relaxation and every later
+    one from the previous converged solution.  A step that fails to converge
+    is retried from the last converged point with half the step, moving the
+    substitutions geometrically, up to max_halvings times.
+
+    Arguments
+    ---------
+    model           Mission(sp=True), its substitutions are updated in place
+    solver          solver name passed to localsolve
+    max_halvings    step halvings before a point is given up
+    """
+    def __init__(self, model, solver=None, max_halvings=4, verbosity=0,
+                 **kwargs):
+        self.model = model
+        self.solver = solver or get_solver()
+        self.max_halvings = max_halvings
+        self.verbosity = verbosity
+        self.kwargs = kwargs
+        self.x0 = None
+        self.gp_solves = 0
+        self.steps = 0
+
+    def _localsolve(self, subs):
+        " one localsolve at subs from the last converged solution "
+        self.model.substitutions.update(subs)
+        if self.x0 is None:
+            sol, info = warm_localsolve(self.model, self.solver,
+                                        verbosity=self.verbosity,
+                                        **self.kwargs)
+            self.gp_solves += info["warm"]
+        else:
+            sol = self.model.localsolve(self.solver, verbosity=self.verbosity,
+                                        x0=self.x0, **self.kwargs)
+            self.gp_solves += len(self.model.program.gps)
+        self.steps += 1
+        self.x0 = dict((vk, getattr(v, "magnitude", v))
+                       for vk, v in sol["freevariables"].items())
+        return sol
+
+    def solve(self, subs):
+        " converged solution at subs (dict of variable: value) "
+        start = dict((vk, self.model.substitutions[vk]) for vk in subs
+                     if vk in self.model.substitutions)
+        t, step, halvings = 0., 1., 0
+        while True:
+            tn = min(1., t + step)
+            try:
+                sol = self._localsolve(_between(start, subs, tn))
+            except Exception:  # pylint: disable=broad-except
+                if self.x0 is None or halvings == self.max_halvings:
+                    self.model.substitutions.update(_between(start, subs, t))
+                    raise
+                step /= 2.
+                halvings += 1
+                continue
+            if tn == 1.:
+                return sol
+            t = tn
+
+    def sweep(self, var, values, project=None):
+        """ solutions at each value of var, solved in sorted order
+
+        Returned in the order of values, None where a point failed; with a
+        projection.Projection, an array of its rows instead (NaN where a
+        point failed), each solution projected and dropped as it is solved.
+        """
+        if project:
+            out = np.full((len(values), len(project.columns)), np.nan)
+        else:
+            out = [None]*len(values)
+        for i in sorted(range(len(values)), key=lambda i: values[i]):
+            try:
+                sol = self.solve({var: values[i]})
+            except Exception:  # pylint: disable=broad-except
+                continue
+            out[i] = project.row(sol) if project else sol
+        return out
+
+def _between(start, end, t):
+    " substitutions a fraction t of the way from start to end in log space "
+    subs = {}
+    for vk, v in end.items():
+        if t < 1 and vk in start and start[vk] > 0 and v > 0:
+            v = start[vk]**(1 - t)*v**t
+        subs[vk] = v
+    return subs